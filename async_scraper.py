@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from config import (BASE_URL, HTTP_CACHE_CONFIG, INCREMENTAL_CRAWL, MAX_CONCURRENCY,
+                    PARSER_BACKEND)
+from http_cache import ResponseCache
+from metrics import profile_run
+from transport import aiohttp_connector, aiohttp_timeout
+from models import SessionLocal
+from rate_limiter import PolitenessScheduler, parse_retry_after
+from records import BookRecord
+from scraper import BATCH_SIZE, BookScraper, listing_page_url
+from traversal import AutoTraversal, CategoryTraversal, TraversalError
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBookScraper(BookScraper):
+    """Concurrent variant of BookScraper built on aiohttp.
+
+    Listing and product pages are fetched concurrently, bounded by a global
+    concurrency limit and the per-host politeness scheduler. Parsing and the
+    CSV/DB sinks are shared with BookScraper, so the output is identical; they
+    run on a single sink thread, so the event loop keeps fetching meanwhile.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, max_concurrency: int = MAX_CONCURRENCY,
+                 scheduler: Optional[PolitenessScheduler] = None,
+                 cache: Optional[ResponseCache] = None,
+                 offline: bool = HTTP_CACHE_CONFIG['offline'],
+                 incremental: bool = INCREMENTAL_CRAWL,
+                 parser_backend: str = PARSER_BACKEND):
+        super().__init__(base_url, scheduler, cache, offline, incremental, parser_backend)
+        self.max_concurrency = max_concurrency
+        self.books_batch: List[BookRecord] = []
+        self.sink_executor: Optional[ThreadPoolExecutor] = None
+
+    async def fetch_html_async(self, client: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Fetch a webpage's HTML, revalidating against the HTTP cache."""
+        cached = self.cache.get(url) if self.cache else None
+        if self.offline:
+            if cached is None:
+                logger.error(f"Error replaying {url}: not cached")
+                return None
+            self.cache.record_hit()
+            self.record_fetch(len(cached.body), 0.0, True)
+            return cached.body.decode('utf-8', errors='replace')
+
+        headers = self.cache.conditional_headers(cached) if self.cache else {}
+        async with self.semaphore:
+            await self.scheduler.acquire_async(url)
+            start = time.perf_counter()
+            status, latency, retry_after = None, None, None
+            try:
+                async with client.get(url, headers=headers) as response:
+                    status = response.status
+                    retry_after = parse_retry_after(
+                        response.headers.get('Retry-After'))
+                    if status == 304 and cached is not None:
+                        self.cache.refresh(url, response.headers)
+                        self.cache.record_hit()
+                        body = cached.body
+                    else:
+                        response.raise_for_status()
+                        body = await response.read()
+                        if self.cache and status == 200:
+                            if cached is not None:
+                                self.cache.record_miss()
+                            self.cache.put(url, status, dict(response.headers), body)
+                    latency = time.perf_counter() - start
+                self.record_fetch(len(body), latency, status == 304)
+            except Exception as e:
+                logger.error(f"Error fetching {url}: {str(e)}")
+                self.record_fetch_error(e, status)
+                return None
+            finally:
+                self.scheduler.release(url, status, latency, retry_after)
+        return body.decode('utf-8', errors='replace')
+
+    async def fetch_page(self, client: aiohttp.ClientSession, url: str) -> Optional[BeautifulSoup]:
+        """Fetch and parse a webpage."""
+        html = await self.fetch_html_async(client, url)
+        if html is None:
+            return None
+        return BeautifulSoup(html, 'html.parser')
+
+    async def in_sink(self, func, *args):
+        """Run `func` on the sink thread, which owns the batch, tracker and session."""
+        return await asyncio.get_running_loop().run_in_executor(self.sink_executor, func, *args)
+
+    async def fetch_book(self, client: aiohttp.ClientSession, book_url: str, db):
+        html = await self.fetch_html_async(client, book_url)
+        await self.in_sink(self.handle_page, book_url, html, db)
+
+    def handle_page(self, book_url: str, html: Optional[str], db):
+        """Parse a fetched product page and save the batch once full."""
+        if html is None:
+            if self.tracker:
+                # Still listed, so the book keeps its fingerprint
+                self.tracker.mark_seen(book_url)
+            return
+        book_details = self.extract_book(book_url, html)
+        if book_details:
+            self.books_batch.append(book_details)
+        if len(self.books_batch) >= BATCH_SIZE:
+            self.save_remaining(db)
+
+    def save_remaining(self, db):
+        if self.books_batch:
+            batch, self.books_batch = self.books_batch, []
+            self.save_batch(batch, db)
+
+    async def fetch_category(self, client: aiohttp.ClientSession, category_url: str, db):
+        page_num = 1
+        tasks = []
+        while True:
+            url = listing_page_url(category_url, page_num)
+            soup = await self.fetch_page(client, url)
+            if not soup:
+                self.listing_failed(url)
+                break
+            book_urls = self.parse_book_links(soup)
+            if not book_urls:
+                break
+            # Product pages are fetched while we move on to the next listing page
+            tasks.extend(asyncio.create_task(self.fetch_book(client, book_url, db))
+                         for book_url in book_urls)
+            if not self.has_next_page(soup):
+                break
+            page_num += 1
+        await asyncio.gather(*tasks)
+
+    async def scrape_all_books_async(self, category_urls: Optional[List[str]] = None):
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with aiohttp.ClientSession(
+                headers=self.headers, connector=aiohttp_connector(self.max_concurrency),
+                timeout=aiohttp_timeout()) as client:
+            if category_urls is None:
+                soup = await self.fetch_page(client, self.base_url)
+                if not soup:
+                    raise TraversalError(f"Could not fetch the home page {self.base_url}")
+                category_urls = self.parse_category_urls(soup)
+            self.start_crawl()
+            complete = False
+            self.sink_executor = ThreadPoolExecutor(max_workers=1)
+            db = SessionLocal()
+            try:
+                logger.info(f"Scraping {len(category_urls)} categories")
+                await asyncio.gather(*(self.fetch_category(client, url, db)
+                                       for url in category_urls))
+                # Write any remaining books
+                await self.in_sink(self.save_remaining, db)
+                complete = True
+            finally:
+                self.sink_executor.shutdown()
+                db.close()
+                self.finish_crawl(complete)
+        logger.info(f"Scheduler stats: {self.scheduler.stats()}")
+        if self.cache:
+            logger.info(f"HTTP cache stats: {self.cache.stats()}")
+        self.metrics.report()
+
+    def scrape_all_books(self, traversal=None):
+        """Full crawl over the category listings.
+
+        Listing pages are walked concurrently, so only category traversal is
+        supported; an auto traversal uses its category strategy. A given
+        traversal's cached category list is reused. Raises TraversalError if
+        the home page could not be fetched.
+        """
+        category_urls = None
+        if isinstance(traversal, AutoTraversal):
+            traversal = next(strategy for strategy in traversal.strategies
+                             if isinstance(strategy, CategoryTraversal))
+        if traversal is not None:
+            if not isinstance(traversal, CategoryTraversal):
+                raise ValueError(f"AsyncBookScraper only supports category traversal, "
+                                 f"not {traversal.name!r}")
+            category_urls = traversal.categories(self)
+            if category_urls is None:
+                raise TraversalError(f"Could not fetch the home page {self.base_url}")
+        asyncio.run(self.scrape_all_books_async(category_urls))
+
+
+def main():
+    scraper = AsyncBookScraper()
+    with profile_run():
+        scraper.scrape_all_books()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the per-row merge loop with the bulk upsert sink.
+
+Each strategy writes `--rows` synthetic books into a fresh SQLite file
+twice: once as inserts, once as updates of the same UPCs.
+
+    python benchmarks/bench_db_write.py --rows 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from models import Base, Book  # noqa: E402
+from persistence import upsert_books  # noqa: E402
+from records import book_record  # noqa: E402
+
+
+def synthetic_books(rows: int, version: int = 0):
+    return [book_record(
+        title=f"Book {i}",
+        price_pence=1000 + (i + version) % 50 * 100,
+        availability=(i + version) % 22,
+        rating=('One', 'Two', 'Three', 'Four', 'Five')[i % 5],
+        category=f"Category {i % 50}",
+        description=f"Description of book {i}. " * 10,
+        upc=f"{i:016x}",
+        product_type='Books',
+        price_excl_tax_pence=1000 + (i + version) % 50 * 100,
+        price_incl_tax_pence=1000 + (i + version) % 50 * 100,
+        tax_pence=0,
+        num_reviews=0,
+        in_stock=(i + version) % 22 > 0,
+    ) for i in range(rows)]
+
+
+def merge_loop(db, books):
+    for book in books:
+        book_id = db.query(Book.id).filter(Book.upc == book.upc).scalar()
+        db.merge(Book(id=book_id, **book.as_dict()))
+
+
+def run(strategy, rows: int, batch: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        results = []
+        for version in (0, 1):
+            books = synthetic_books(rows, version)
+            db = Session()
+            start = time.perf_counter()
+            for i in range(0, rows, batch):
+                strategy(db, books[i:i + batch])
+                db.commit()
+            results.append(rows / (time.perf_counter() - start))
+            db.close()
+        engine.dispose()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    for name, strategy in (('merge loop', merge_loop), ('bulk upsert', upsert_books)):
+        inserts, updates = run(strategy, args.rows, args.batch)
+        print(f"{name:>12}: {inserts:9.0f} inserts/sec  {updates:9.0f} updates/sec")
+
+
+if __name__ == "__main__":
+    main()
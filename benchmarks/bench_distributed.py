@@ -0,0 +1,65 @@
+"""Throughput of the distributed crawl against a local fixture server.
+
+Runs a coordinator plus 1, 2, 4, ... worker processes over a saved site,
+each run with a fresh frontier and database, and reports books per second.
+`--latency` adds a per-request delay so fetches behave more like the
+network than like a local disk.
+
+    python benchmarks/bench_distributed.py fixtures/site --max-workers 8 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Measure crawl throughput, not politeness or cache hits; set before the
+# config is imported here and in the spawned processes
+os.environ.setdefault('PER_HOST_RATE_LIMIT', '1000')
+os.environ.setdefault('MAX_RATE', '1000')
+os.environ.setdefault('MAX_IN_FLIGHT_PER_HOST', '64')
+os.environ['HTTP_CACHE'] = '0'
+# Broken links in the fixture site should not stall a run on retry backoff
+os.environ.setdefault('FRONTIER_MAX_ATTEMPTS', '1')
+
+from fixture_server import FixtureServer  # noqa: E402
+
+
+def run(root: str, workers: int, latency: float) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Spawned workers read the database location from the environment
+        os.environ['SQLITE_PATH'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        with FixtureServer(root, latency=latency) as server:
+            from distributed import crawl_distributed
+            from frontier import CrawlFrontier
+            from models import Base, create_db_engine
+
+            engine = create_db_engine(os.environ['SQLITE_PATH'])
+            Base.metadata.create_all(engine)
+            frontier = CrawlFrontier(db_engine=engine)
+            start = time.perf_counter()
+            crawl_distributed(workers, server.base_url, frontier=frontier)
+            elapsed = time.perf_counter() - start
+            books = frontier.counts(['book']).get('done', 0)
+            engine.dispose()
+    return books / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', help='Directory served as the site')
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Seconds the server waits before each response')
+    args = parser.parse_args()
+
+    workers = 1
+    while workers <= args.max_workers:
+        print(f"{workers:>3} workers: {run(args.root, workers, args.latency):8.1f} books/sec")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Throughput and peak memory of the streaming exporters.
+
+A synthetic `books` table is generated once, then each exporter runs in a
+fresh subprocess so its peak RSS is measured in isolation. Categories drift
+through the table, so each export chunk sees a different set of them.
+
+    python benchmarks/bench_export.py --rows 1000000 --formats csv xlsx
+"""
+import argparse
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RATINGS = ('One', 'Two', 'Three', 'Four', 'Five')
+
+
+def category(i: int) -> str:
+    """Ten categories per 1000 rows, shifting by one every 1000 rows."""
+    return f"Category {i // 1000 + i % 10}"
+
+
+def build_table(path: str, rows: int, chunk: int = 50000):
+    """Fill a SQLite file with `rows` synthetic books using plain sqlite3."""
+    from sqlalchemy import create_engine
+    from models import Base
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    now = datetime.utcnow().isoformat(sep=' ')
+    for start in range(0, rows, chunk):
+        conn.executemany(
+            "INSERT INTO books (title, price, availability, rating, category, description, upc,"
+            " product_type, price_excl_tax, price_incl_tax, tax, num_reviews, in_stock,"
+            " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((f"Book {i}", 10.0 + i % 50, i % 22, RATINGS[i % 5], category(i),
+              f"Description of book {i}. " * 20, f"{i:016x}", 'Books', 10.0 + i % 50,
+              10.0 + i % 50, 0.0, i % 7, i % 22 > 0, now, now)
+             for i in range(start, min(start + chunk, rows))))
+        conn.commit()
+    conn.close()
+
+
+def run_exporter(fmt: str, out_dir: str):
+    """Child process: run one exporter and print elapsed seconds and peak RSS."""
+    import export_utils
+
+    exporters = {
+        'csv': export_utils.export_to_csv,
+        'xlsx': export_utils.export_to_excel,
+        'parquet': export_utils.export_to_parquet,
+        'arrow': export_utils.export_to_arrow,
+    }
+    start = time.perf_counter()
+    if exporters[fmt](os.path.join(out_dir, f"books.{fmt}")) is None:
+        sys.exit(f"{fmt} export failed")
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {peak_kb}")
+
+
+def measure_export(db_path: str, fmt: str, out_dir: str):
+    """Run one exporter in a fresh process; returns (seconds, peak RSS in MiB)."""
+    # Memory-mapped database pages would count towards RSS, so turn mmap off
+    env = {**os.environ, 'SQLITE_PATH': f"sqlite:///{db_path}", 'SQLITE_MMAP_SIZE': '0'}
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', fmt, '--out', out_dir],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    elapsed, peak_kb = output.split()[-2:]
+    return float(elapsed), int(peak_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--formats', nargs='+', default=['csv', 'xlsx', 'parquet', 'arrow'])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_exporter(args.child, args.out)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        start = time.perf_counter()
+        build_table(db_path, args.rows)
+        print(f"Built {args.rows} rows in {time.perf_counter() - start:.1f}s")
+        for fmt in args.formats:
+            elapsed, peak_mib = measure_export(db_path, fmt, tmp)
+            print(f"{fmt:>8}: {args.rows / elapsed:9.0f} rows/sec  "
+                  f"peak RSS {peak_mib:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Storage and query cost of the price history over many simulated crawls.
+
+Each crawl re-scrapes every book, and a fraction of them change price or
+stock. The history table (changed fields only, integer pence, integer ids)
+is compared with keeping a full snapshot row per book per crawl. The
+queries are checked against the simulated truth.
+
+    python benchmarks/bench_history.py --books 1000 --crawls 300 --change-rate 0.05
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from history import HistoryRecorder, catalogue_at, changes_since, price_series  # noqa: E402
+
+SNAPSHOT_TABLE = """CREATE TABLE book_snapshots (
+    crawl_id INTEGER, upc VARCHAR, price FLOAT, availability INTEGER, in_stock BOOLEAN,
+    PRIMARY KEY (crawl_id, upc))"""
+
+
+def simulate(books: int, crawls: int, change_rate: float, seed: int = 0):
+    """Yield the full list of scraped books for each crawl."""
+    rng = random.Random(seed)
+    state = {f"{i:016x}": {'price': rng.randint(1000, 5999) / 100,
+                           'availability': rng.randint(0, 22)} for i in range(books)}
+    for _ in range(crawls):
+        for upc in rng.sample(list(state), int(books * change_rate)):
+            if rng.random() < 0.5:
+                state[upc]['price'] = rng.randint(1000, 5999) / 100
+            else:
+                state[upc]['availability'] = rng.randint(0, 22)
+        yield [{'upc': upc, 'price': book['price'], 'availability': book['availability'],
+                'in_stock': book['availability'] > 0} for upc, book in state.items()]
+
+
+def file_size(engine) -> int:
+    with engine.connect() as conn:
+        conn.execute(text('VACUUM'))
+    return os.path.getsize(engine.url.database)
+
+
+def timed(fn, *args, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--books', type=int, default=1000)
+    parser.add_argument('--crawls', type=int, default=300)
+    parser.add_argument('--change-rate', type=float, default=0.05,
+                        help='Fraction of books changing per crawl')
+    parser.add_argument('--batch', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history_engine = create_engine(f"sqlite:///{os.path.join(tmp, 'history.db')}")
+        snapshot_engine = create_engine(f"sqlite:///{os.path.join(tmp, 'snapshots.db')}")
+        with snapshot_engine.begin() as conn:
+            conn.execute(text(SNAPSHOT_TABLE))
+        Session = sessionmaker(bind=history_engine)
+        truth = []
+        record_time = 0.0
+        for crawl_books in simulate(args.books, args.crawls, args.change_rate):
+            db = Session()
+            recorder = HistoryRecorder(db)
+            start = time.perf_counter()
+            for i in range(0, len(crawl_books), args.batch):
+                recorder.record(db, crawl_books[i:i + args.batch])
+                db.commit()
+                recorder.commit()
+            record_time += time.perf_counter() - start
+            recorder.finish(db)
+            db.close()
+            truth.append({book['upc']: book for book in crawl_books})
+            with snapshot_engine.begin() as conn:
+                conn.execute(text('INSERT INTO book_snapshots VALUES '
+                                  '(:crawl_id, :upc, :price, :availability, :in_stock)'),
+                             [dict(book, crawl_id=recorder.crawl_id) for book in crawl_books])
+
+        history_bytes, snapshot_bytes = file_size(history_engine), file_size(snapshot_engine)
+        print(f"{args.crawls} crawls of {args.books} books, {args.change_rate:.0%} changing")
+        print(f"{'history':>10}: {history_bytes / 1024:10.0f} KiB")
+        print(f"{'snapshots':>10}: {snapshot_bytes / 1024:10.0f} KiB  "
+              f"({snapshot_bytes / history_bytes:.1f}x)")
+        print(f"{'record':>10}: {record_time / args.crawls * 1000:8.2f} ms per crawl")
+
+        db = Session()
+        upcs = random.Random(1).sample(list(truth[-1]), 20)
+        series, ms = timed(lambda: [price_series(db, upc) for upc in upcs])
+        print(f"{'series':>10}: {ms / len(upcs):8.2f} ms per UPC")
+        since = max(args.crawls - 10, 0)
+        changes, ms = timed(changes_since, db, since)
+        print(f"{'since':>10}: {ms:8.2f} ms for the last {args.crawls - since} crawls "
+              f"({len(changes)} changes)")
+        middle = args.crawls // 2
+        catalogue, ms = timed(catalogue_at, db, middle)
+        print(f"{'as of':>10}: {ms:8.2f} ms to rebuild crawl {middle}")
+        db.close()
+
+        expected = truth[middle - 1]
+        assert all(abs(catalogue[upc]['price'] - book['price']) < 1e-9
+                   and catalogue[upc]['availability'] == book['availability']
+                   for upc, book in expected.items()), 'point-in-time catalogue is wrong'
+        assert [price for _, _, price in series[0]][-1] == truth[-1][upcs[0]]['price']
+
+
+if __name__ == "__main__":
+    main()
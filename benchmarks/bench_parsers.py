@@ -0,0 +1,74 @@
+"""Check parser backend parity and measure parse throughput.
+
+Every product page under `root` (a saved site, see fixture_server.py) is
+parsed by each backend; any page where a backend's BookRecord differs from
+the BeautifulSoup reference is reported and the script exits non-zero.
+check_parsers.py runs the same check on the committed edge-case pages.
+
+    python benchmarks/bench_parsers.py fixtures/site --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import PARSERS, SoupBookParser  # noqa: E402
+
+
+def load_product_pages(root: str):
+    pages = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith('.html'):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, encoding='utf-8') as f:
+                html = f.read()
+            if 'table-striped' in html:
+                pages.append((path, html))
+    return pages
+
+
+def check_parity(pages, parsers):
+    reference = SoupBookParser()
+    mismatches = 0
+    for path, html in pages:
+        expected = reference.parse_book(html, path)
+        for parser in parsers:
+            actual = parser.parse_book(html, path)
+            if actual != expected:
+                mismatches += 1
+                print(f"MISMATCH [{parser.name}] {path}\n  expected: {expected}\n  actual:   {actual}")
+    return mismatches
+
+
+def bench(pages, parser, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path, html in pages:
+            parser.parse_book(html, path)
+    return len(pages) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_product_pages(args.root)
+    if not pages:
+        sys.exit(f"No product pages found under {args.root}")
+    parsers = [cls() for cls in PARSERS.values()]
+
+    mismatches = check_parity(pages, parsers)
+    print(f"Parity: {len(pages)} pages, {mismatches} mismatches")
+    for p in parsers:
+        print(f"{p.name:>6}: {bench(pages, p, args.repeat):8.1f} pages/sec")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Measure parse throughput of CrawlPipeline against saved pages.
+
+Pages are "fetched" from memory so only the parse stage and the queue
+hand-offs are measured, for an increasing number of parser processes.
+
+    python benchmarks/bench_pipeline.py fixtures/site --copies 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import load_product_pages  # noqa: E402
+from pipeline import CrawlPipeline  # noqa: E402
+
+
+def run(pages, workers: int, backend: str) -> float:
+    html_by_url = dict(pages)
+    urls = list(html_by_url)
+    parsed = []
+    pipeline = CrawlPipeline(fetch=html_by_url.get, sink=parsed.extend,
+                             parser_backend=backend, parse_workers=workers)
+    start = time.perf_counter()
+    pipeline.run(urls)
+    elapsed = time.perf_counter() - start
+    assert len(parsed) == len(urls), f"parsed {len(parsed)} of {len(urls)} pages"
+    return len(urls) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root')
+    parser.add_argument('--copies', type=int, default=10,
+                        help='Repeat the saved pages to get a longer run')
+    parser.add_argument('--backend', default='soup')
+    args = parser.parse_args()
+
+    pages = load_product_pages(args.root)
+    pages = [(f"{path}#{i}", html) for i in range(args.copies) for path, html in pages]
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        print(f"{workers:>3} parse workers: {run(pages, workers, args.backend):8.1f} pages/sec")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Repeated GUI-style queries with and without the viewer query cache.
+
+Each simulated action is what the GUI does on a search or category change:
+the first page of the filtered list, sometimes the next page as the user
+scrolls, and the catalogue stats. Filters are drawn from a small, skewed
+set, as a user flips between a few categories and searches. Every
+--write-every actions a writer changes a price and bumps the data version,
+as a crawl commit does. Both runs replay the same actions against their
+own copy of the database, and their results are checked to be identical.
+
+    python benchmarks/bench_query_cache.py --rows 20000 --actions 2000 --write-every 100
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from bench_export import build_table  # noqa: E402
+from persistence import bump_data_version  # noqa: E402
+from query_cache import QueryCache, cached_book_page, cached_stats  # noqa: E402
+
+PAGE_SIZE = 200
+SEARCH_TERMS = ['Book 1', 'book 42', 'Book 7', 'book 123']
+
+
+def actions(count: int, seed: int = 0):
+    """Yield (search term, category, scrolls) filters, a few of them popular."""
+    rng = random.Random(seed)
+    categories = [f"Category {i}" for i in range(50)]
+    weights = [1 / (rank + 1) for rank in range(len(categories))]
+    for _ in range(count):
+        roll = rng.random()
+        term = rng.choice(SEARCH_TERMS) if roll < 0.2 else None
+        category = rng.choices(categories, weights)[0] if roll > 0.1 else None
+        yield term, category, rng.random() < 0.5
+
+
+def replay(path: str, cache: QueryCache, count: int, write_every: int):
+    """Run the actions; returns (seconds, results)."""
+    engine = create_engine(f"sqlite:///{path}")
+    Session = sessionmaker(bind=engine)
+    results = []
+    start = time.perf_counter()
+    for i, (term, category, scroll) in enumerate(actions(count)):
+        if write_every and i and i % write_every == 0:
+            with Session() as writer:
+                writer.execute(text("UPDATE books SET price = price + 1 WHERE id = :id"),
+                               {'id': i % 1000 + 1})
+                bump_data_version(writer)
+                writer.commit()
+        with Session() as db:
+            page = cached_book_page(db, term, category, limit=PAGE_SIZE, cache=cache)
+            pages = [page]
+            if scroll and len(page) == PAGE_SIZE:
+                pages.append(cached_book_page(db, term, category, after_id=page[-1].id,
+                                              limit=PAGE_SIZE, cache=cache))
+            stats = cached_stats(db, cache=cache)
+        results.append(([tuple(row) for rows in pages for row in rows],
+                        stats['total_books'], round(stats['avg_price'], 6)))
+    seconds = time.perf_counter() - start
+    engine.dispose()
+    return seconds, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--actions', type=int, default=2000)
+    parser.add_argument('--write-every', type=int, default=100,
+                        help='Actions between simulated crawl commits (0 for none)')
+    parser.add_argument('--max-entries', type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, 'base.db')
+        build_table(base, args.rows)
+        runs = {}
+        for name, cache in (('uncached', QueryCache(enabled=False)),
+                            ('cached', QueryCache(args.max_entries, check_seconds=0))):
+            path = os.path.join(tmp, f'{name}.db')
+            shutil.copy(base, path)
+            seconds, results = replay(path, cache, args.actions, args.write_every)
+            runs[name] = results
+            line = f"{name:>9}: {args.actions / seconds:8.1f} actions/sec  " \
+                   f"{seconds / args.actions * 1000:7.2f} ms per action"
+            if cache.enabled:
+                stats = cache.stats()
+                line += f"  hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, " \
+                        f"{stats['misses']} misses, {stats['invalidations']} invalidations, " \
+                        f"{stats['evictions']} evictions)"
+            print(line)
+        assert runs['cached'] == runs['uncached'], 'cached results differ from the database'
+
+
+if __name__ == "__main__":
+    main()
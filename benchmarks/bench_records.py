@@ -0,0 +1,118 @@
+"""Per-record memory and streaming throughput of BookRecord against the old book dict.
+
+Synthetic product page fields are assembled into records by the parsers'
+build_book and into the 13-key dict the parsers used to return. Memory is
+what tracemalloc sees while --hold books are kept in a list, per book.
+Throughput streams --records books through assembly and the CSV sink in
+crawl-sized batches, with the fields generated the same way for both.
+
+    python benchmarks/bench_records.py --records 1000000 --hold 100000
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import NUMBER_RE, build_book, clean_price  # noqa: E402
+from records import BOOK_FIELDS  # noqa: E402
+from scraper import BATCH_SIZE  # noqa: E402
+
+RATINGS = ('One', 'Two', 'Three', 'Four', 'Five')
+
+
+def legacy_book(title, price_text, availability_text, rating, category, description,
+                product_info):
+    """The dict build_book returned before BookRecord."""
+    match = NUMBER_RE.search(availability_text)
+    availability = int(match.group()) if match else 0
+    return {
+        'title': title,
+        'price': clean_price(price_text),
+        'availability': availability,
+        'rating': rating,
+        'category': category,
+        'description': description,
+        'upc': product_info.get('UPC', ''),
+        'product_type': product_info.get('Product Type', ''),
+        'price_excl_tax': clean_price(product_info.get('Price (excl. tax)', '0')),
+        'price_incl_tax': clean_price(product_info.get('Price (incl. tax)', '0')),
+        'tax': clean_price(product_info.get('Tax', '0')),
+        'num_reviews': int(product_info.get('Number of reviews', '0')),
+        'in_stock': availability > 0
+    }
+
+
+def page_fields(count: int):
+    """Yield build_book arguments as a parser extracts them, fresh strings each time."""
+    for i in range(count):
+        price = f"£{10 + i % 50}.{i % 100:02d}"
+        yield dict(
+            title=f"Book {i}",
+            price_text=price,
+            availability_text=f"In stock ({i % 23} available)",
+            rating=f"star-rating {RATINGS[i % 5]}".split()[1],
+            category=f" Category {i % 50} ".strip(),
+            description=f"Description of book {i}. " * 10,
+            product_info={'UPC': f"{i:016x}", 'Product Type': ' Books '.strip(),
+                          'Price (excl. tax)': price, 'Price (incl. tax)': price,
+                          'Tax': '£0.00', 'Number of reviews': '0'},
+        )
+
+
+def held_bytes(build, count: int) -> float:
+    """Bytes per book, strings included, while `count` books are kept alive."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    books = [build(**kwargs) for kwargs in page_fields(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del books
+    return (after - before) / count
+
+
+def stream(build, write_batch, count: int) -> float:
+    """Books per second through assembly and the CSV sink."""
+    with open(os.devnull, 'w', newline='', encoding='utf-8') as f:
+        start = time.perf_counter()
+        batch = []
+        for kwargs in page_fields(count):
+            batch.append(build(**kwargs))
+            if len(batch) >= BATCH_SIZE:
+                write_batch(f, batch)
+                batch.clear()
+        write_batch(f, batch)
+        return count / (time.perf_counter() - start)
+
+
+def write_dicts(f, books):
+    csv.DictWriter(f, fieldnames=BOOK_FIELDS).writerows(books)
+
+
+def write_records(f, books):
+    csv.writer(f).writerows(book.csv_row() for book in books)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=1000000, help='Books streamed')
+    parser.add_argument('--hold', type=int, default=100000, help='Books held for memory')
+    args = parser.parse_args()
+
+    variants = (('dict', legacy_book, write_dicts), ('record', build_book, write_records))
+    memory = {}
+    for name, build, _ in variants:
+        memory[name] = held_bytes(build, args.hold)
+        print(f"{name:>8}: {memory[name]:7.0f} bytes per book held ({args.hold} books)")
+    print(f"{'saved':>8}: {memory['dict'] - memory['record']:7.0f} bytes per book "
+          f"({1 - memory['record'] / memory['dict']:.0%})")
+    for name, build, write_batch in variants:
+        rate = stream(build, write_batch, args.records)
+        print(f"{name:>8}: {rate:9.0f} books/sec streaming {args.records} books to CSV")
+
+
+if __name__ == "__main__":
+    main()
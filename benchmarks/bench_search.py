@@ -0,0 +1,66 @@
+"""Search latency: FTS5 index versus the old ILIKE scan.
+
+    python benchmarks/bench_search.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import or_  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from bench_export import build_table  # noqa: E402
+from models import Book, create_db_engine  # noqa: E402
+from search import ensure_search_index, search_books  # noqa: E402
+
+# Selective, moderately common, very common and absent terms
+TERMS = ['12345', 'Book 777', 'description', 'zzz']
+
+
+def ilike_title(db, term):
+    return db.query(Book).filter(Book.title.ilike(f"%{term}%")).limit(50).all()
+
+
+def ilike_title_description(db, term):
+    pattern = f"%{term}%"
+    return db.query(Book).filter(
+        or_(Book.title.ilike(pattern), Book.description.ilike(pattern))).limit(50).all()
+
+
+def timed(fn, db, term: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(db, term)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        build_table(path, args.rows)
+        engine = create_db_engine(f"sqlite:///{path}")
+        start = time.perf_counter()
+        if not ensure_search_index(engine):
+            sys.exit("SQLite was built without FTS5")
+        print(f"Indexed {args.rows} books in {time.perf_counter() - start:.1f}s")
+        db = sessionmaker(bind=engine)()
+        print(f"{'term':>14} {'ILIKE title':>12} {'ILIKE t/d':>12} {'FTS5 ranked':>12}  (ms)")
+        for term in TERMS:
+            print(f"{term!r:>14} {timed(ilike_title, db, term, args.repeat):12.2f}"
+                  f" {timed(ilike_title_description, db, term, args.repeat):12.2f}"
+                  f" {timed(search_books, db, term, args.repeat):12.2f}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
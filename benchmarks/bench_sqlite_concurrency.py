@@ -0,0 +1,105 @@
+"""Concurrent read/write benchmark for the SQLite storage profile.
+
+A writer thread upserts crawl-sized batches while reader threads run
+GUI-style queries against a copy of the data. The default rollback journal
+is compared with the tuned WAL profile from config.SQLITE_PRAGMAS.
+
+    python benchmarks/bench_sqlite_concurrency.py --rows 1000 --seconds 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from bench_db_write import synthetic_books  # noqa: E402
+from config import SQLITE_PRAGMAS  # noqa: E402
+from models import Base, Book, create_db_engine  # noqa: E402
+from persistence import upsert_books  # noqa: E402
+
+
+def run(pragmas, rows: int, readers: int, seconds: float, batch: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Without a busy timeout the default profile fails immediately on locks
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                                  pragmas=pragmas or {'busy_timeout': 0})
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        upsert_books(db, synthetic_books(rows))
+        db.commit()
+        db.close()
+
+        stop = threading.Event()
+        counts = {'reads': 0, 'read_errors': 0, 'commits': 0, 'write_errors': 0}
+        lock = threading.Lock()
+
+        def bump(key):
+            with lock:
+                counts[key] += 1
+
+        def writer():
+            version = 1
+            while not stop.is_set():
+                books = synthetic_books(rows, version)
+                for i in range(0, rows, batch):
+                    if stop.is_set():
+                        return
+                    session = Session()
+                    try:
+                        upsert_books(session, books[i:i + batch])
+                        session.commit()
+                        bump('commits')
+                    except Exception:
+                        session.rollback()
+                        bump('write_errors')
+                    finally:
+                        session.close()
+                version += 1
+
+        def reader():
+            while not stop.is_set():
+                session = Session()
+                try:
+                    session.query(func.count(Book.id)).scalar()
+                    session.query(Book).filter(Book.category == 'Category 7').limit(50).all()
+                    session.query(func.avg(Book.price)).scalar()
+                    bump('reads')
+                except Exception:
+                    bump('read_errors')
+                finally:
+                    session.close()
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+        return {key: value / seconds for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--batch', type=int, default=20)
+    args = parser.parse_args()
+
+    for name, pragmas in (('default', None), ('tuned WAL', SQLITE_PRAGMAS)):
+        result = run(pragmas, args.rows, args.readers, args.seconds, args.batch)
+        print(f"{name:>10}: " + "  ".join(f"{k}={v:.1f}/s" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
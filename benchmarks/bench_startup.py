@@ -0,0 +1,91 @@
+"""Start-up cost of the command line entry points, from `python -X importtime`.
+
+Each command runs in a fresh interpreter against a small SQLite catalogue.
+Wall time is the best of --repeat runs. Import time is the interpreter's own
+importtime total, without `site`, which every Python process pays. The
+heaviest top-level imports are listed too. With --budget-ms the exit status
+is 1 if `cli stats` is slower than the budget.
+
+    python benchmarks/bench_startup.py --repeat 5 --budget-ms 100
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from bench_export import build_table  # noqa: E402
+
+COMMANDS = {
+    'python -c pass': ['-c', 'pass'],
+    'cli --help': ['cli.py', '--help'],
+    'cli stats': ['cli.py', 'stats'],
+    'cli stats --books 5': ['cli.py', 'stats', '--books', '5'],
+    'view_data stats': ['-c', 'import view_data; view_data.view_database_stats()'],
+}
+
+
+def parse_importtime(stderr: str):
+    """Total import microseconds outside `site`, and (microseconds, module) per top-level import."""
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  ') or name.strip() == 'site':
+            continue
+        top_level.append((int(cumulative), name.strip()))
+    return sum(us for us, _ in top_level), sorted(top_level, reverse=True)
+
+
+def measure(argv, env, repeat: int):
+    """Best wall time (ms), import time (ms) and heaviest top-level imports."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *argv], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    result = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=ROOT, env=env,
+                            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True)
+    total, top = parse_importtime(result.stderr)
+    return best * 1000, total / 1000, top
+
+
+def run(rows: int = 1000, repeat: int = 5) -> dict:
+    """Wall-clock ms per command, keyed by command name."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'startup.db')
+        build_table(path, rows)
+        env = dict(os.environ, SQLITE_PATH=f"sqlite:///{path}", STATS_SUMMARY='0')
+        results = {}
+        for name, argv in COMMANDS.items():
+            wall, imports, top = measure(argv, env, repeat)
+            results[name] = wall
+            heaviest = ', '.join(f"{module} {us / 1000:.0f}" for us, module in top[:4])
+            print(f"{name:>20}: {wall:7.1f} ms wall  {imports:7.1f} ms imports  ({heaviest})")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, help='Fail if `cli stats` takes longer')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.budget_ms and results['cli stats'] > args.budget_ms:
+        print(f"cli stats took {results['cli stats']:.1f} ms, over the "
+              f"{args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Latency of catalogue statistics on a large synthetic table.
+
+Compares the old per-category COUNT loop plus Python-side price average
+with the grouped query and the materialized category_stats summary.
+
+    python benchmarks/bench_stats.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from bench_export import build_table  # noqa: E402
+from models import Base, Book, create_db_engine  # noqa: E402
+from stats import get_catalogue_stats, refresh_category_summary  # noqa: E402
+
+
+def legacy_stats(db):
+    total_books = db.query(Book).count()
+    categories = [cat[0] for cat in db.query(Book.category).distinct().all()]
+    counts = {cat: db.query(Book).filter(Book.category == cat).count() for cat in categories}
+    prices = db.query(Book.price).all()
+    avg_price = sum(price[0] for price in prices) / len(prices) if prices else 0
+    return total_books, counts, avg_price
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        build_table(path, args.rows)
+        engine = create_db_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        refresh_category_summary(db)
+        db.commit()
+
+        print(f"{args.rows} books, mean latency over {args.repeat} runs:")
+        print(f"  per-category loop: {timed(lambda: legacy_stats(db), args.repeat):9.1f} ms")
+        print(f"  grouped query:     {timed(lambda: get_catalogue_stats(db, False), args.repeat):9.1f} ms")
+        print(f"  summary table:     {timed(lambda: get_catalogue_stats(db, True), args.repeat):9.1f} ms")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
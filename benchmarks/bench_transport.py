@@ -0,0 +1,63 @@
+"""Request throughput and connection reuse of the HTTP transport.
+
+Fetches product pages from the fixture server with a pool of threads, as
+the pipeline's fetch stage does, using a fresh connection per request, a
+default requests.Session and the tuned transport. Use more threads than
+requests' default pool size (10) to see connections being discarded.
+
+    python benchmarks/bench_transport.py fixtures/site --threads 16 --latency 0.01
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+from requests.adapters import HTTPAdapter  # noqa: E402
+
+from bench_parsers import load_product_pages  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+from transport import TunedAdapter, build_session  # noqa: E402
+
+
+class CountingAdapter(HTTPAdapter):
+    def stats(self):
+        pools = [self.poolmanager.pools[key] for key in self.poolmanager.pools.keys()]
+        return {'connections_opened': sum(pool.num_connections for pool in pools)}
+
+
+def run(urls, threads: int, get) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for response in pool.map(get, urls):
+            response.raise_for_status()
+    return len(urls) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--copies', type=int, default=3, help='Times each page is fetched')
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    paths = [os.path.relpath(path, args.root) for path, _ in load_product_pages(args.root)]
+    with FixtureServer(args.root, latency=args.latency) as server:
+        urls = [f"{server.base_url}/{path}" for path in paths] * args.copies
+
+        print(f"{'new connection':>16}: {run(urls, args.threads, requests.get):8.1f} req/sec  "
+              f"connections {len(urls)}")
+        for name, adapter in (('default session', CountingAdapter()),
+                              ('tuned session', TunedAdapter())):
+            session = build_session(adapter)
+            rate = run(urls, args.threads, session.get)
+            print(f"{name:>16}: {rate:8.1f} req/sec  "
+                  f"connections {adapter.stats()['connections_opened']}")
+
+
+if __name__ == "__main__":
+    main()
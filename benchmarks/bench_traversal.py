@@ -0,0 +1,96 @@
+"""Compare crawl traversal strategies: per-category listings vs the catalogue index.
+
+For each strategy the book URLs are enumerated against the fixture server,
+counting listing requests and timing the walk; both must find the same
+books. With --crawl each strategy then runs a full crawl into a scratch
+database. Latency makes the parallel index fetches visible; the politeness
+limits come from the usual environment variables.
+
+    python benchmarks/bench_traversal.py fixtures/synthetic --latency 0.05 --crawl
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Measure the traversal, not politeness delays or cache hits
+os.environ.setdefault('PER_HOST_RATE_LIMIT', '1000')
+os.environ.setdefault('MAX_RATE', '1000')
+os.environ['HTTP_CACHE'] = '0'
+WORK_DIR = tempfile.mkdtemp(prefix='traversal-bench-')
+os.environ['SQLITE_PATH'] = f"sqlite:///{os.path.join(WORK_DIR, 'crawl.db')}"
+
+from fixture_server import FixtureServer  # noqa: E402
+from models import Base, Book, SessionLocal, engine  # noqa: E402
+from scraper import BookScraper  # noqa: E402
+from traversal import CatalogueIndexTraversal, CategoryTraversal  # noqa: E402
+
+
+class CountingScraper(BookScraper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = 0
+
+    def fetch_html(self, url):
+        self.requests += 1
+        return super().fetch_html(url)
+
+
+def enumerate_urls(base_url: str, traversal):
+    scraper = CountingScraper(base_url)
+    start = time.perf_counter()
+    urls = list(traversal.book_urls(scraper) or [])
+    return urls, scraper.requests, time.perf_counter() - start
+
+
+def crawl(base_url: str, traversal, name: str):
+    db = SessionLocal()
+    db.query(Book).delete()
+    db.commit()
+    scraper = CountingScraper(base_url)
+    scraper.csv_path = os.path.join(WORK_DIR, f"{name}.csv")
+    start = time.perf_counter()
+    scraper.scrape_all_books(traversal)
+    elapsed = time.perf_counter() - start
+    books = db.query(Book).count()
+    db.close()
+    return books, scraper.requests, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root')
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, default=4, help='Parallel index page fetches')
+    parser.add_argument('--crawl', action='store_true', help='Also run a full crawl per strategy')
+    args = parser.parse_args()
+
+    strategies = (('category', CategoryTraversal()),
+                  ('catalogue', CatalogueIndexTraversal(args.workers)))
+    Base.metadata.create_all(bind=engine)
+    try:
+        with FixtureServer(args.root, latency=args.latency) as server:
+            found = {}
+            for name, traversal in strategies:
+                urls, requests, elapsed = enumerate_urls(server.base_url, traversal)
+                found[name] = set(urls)
+                print(f"{name:>10}: {len(urls):6d} books  {requests:4d} listing requests  "
+                      f"{elapsed:7.2f}s")
+            if found['category'] != found['catalogue']:
+                print(f"Strategies disagree: {len(found['category'] ^ found['catalogue'])} "
+                      f"URLs differ")
+            if args.crawl:
+                for name, traversal in strategies:
+                    books, requests, elapsed = crawl(server.base_url, traversal, name)
+                    print(f"{name:>10} crawl: {books:6d} books  {requests:5d} requests  "
+                          f"{books / elapsed:7.1f} books/sec")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
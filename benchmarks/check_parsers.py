@@ -0,0 +1,58 @@
+"""Check every parser backend against the committed product pages.
+
+The pages in fixtures/product_pages follow the site's product page markup
+and cover edge cases: a missing description, "In stock (0 available)", a
+star-rating class with stray whitespace, entities and mis-decoded prices.
+Each backend's record must equal the one in expected.json and the
+BeautifulSoup reference; any difference is printed and the script exits
+non-zero.
+
+    python benchmarks/check_parsers.py
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsers import check_parity, load_product_pages  # noqa: E402
+from parsers import PARSERS  # noqa: E402
+
+FIXTURE_PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'fixtures', 'product_pages')
+
+
+def check_expected(pages, parsers, expected) -> int:
+    mismatches = 0
+    for path, html in pages:
+        wanted = expected[os.path.basename(path)]
+        for parser in parsers:
+            book = parser.parse_book(html, path)
+            actual = book.as_dict() if book is not None else None
+            if actual != wanted:
+                mismatches += 1
+                print(f"MISMATCH [{parser.name}] {path}\n  expected: {wanted}\n  actual:   {actual}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', nargs='?', default=FIXTURE_PAGES)
+    args = parser.parse_args()
+
+    pages = load_product_pages(args.root)
+    with open(os.path.join(args.root, 'expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    if sorted(os.path.basename(path) for path, _ in pages) != sorted(expected):
+        sys.exit(f"Pages under {args.root} do not match expected.json")
+    parsers = [cls() for cls in PARSERS.values()]
+
+    mismatches = check_expected(pages, parsers, expected) + check_parity(pages, parsers)
+    print(f"{len(pages)} pages, {len(parsers)} backends "
+          f"({', '.join(p.name for p in parsers)}), {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Serve saved books.toscrape.com pages from a local directory.
+
+Pages are stored using the site's own URL layout (``index.html``,
+``catalogue/category/books/travel_2/index.html``, ...) so scrapers can be
+pointed at ``http://127.0.0.1:<port>`` instead of the live site. Latency
+and transient errors can be injected to mimic a real server.
+
+    python benchmarks/fixture_server.py mirror fixtures/site --categories 2
+    python benchmarks/fixture_server.py serve fixtures/site --port 8765 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import functools
+import os
+import random
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    # Keep connections alive like a real server, so clients can reuse them
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # second waits for the client's delayed ACK (~40 ms) on a kept-alive socket
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class InjectingHandler(QuietHandler):
+    """Delays every response and fails a fraction of them with 503."""
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    retry_after = 1
+
+    def do_GET(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_response(503)
+            self.send_header('Retry-After', str(self.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+class FixtureServer:
+    """Threaded HTTP server over a directory, usable as a context manager.
+
+    `latency` (+ up to `jitter`) seconds are added to every response and
+    `error_rate` of requests fail with 503 Service Unavailable.
+    """
+
+    def __init__(self, root: str, host: str = '127.0.0.1', port: int = 0,
+                 handler_class=QuietHandler, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0):
+        if latency or jitter or error_rate:
+            handler_class = type('Handler', (InjectingHandler,), {
+                'latency': latency, 'jitter': jitter, 'error_rate': error_rate})
+        handler = functools.partial(handler_class, directory=root)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def mirror_site(dest: str, max_categories: int = 2):
+    """Save the home page, a few categories and their product pages to `dest`."""
+    from scraper import BookScraper, listing_page_url
+
+    scraper = BookScraper()
+
+    def save(url: str):
+        response = scraper.session.get(url)
+        response.raise_for_status()
+        path = urlsplit(url).path.lstrip('/') or 'index.html'
+        if path.endswith('/'):
+            path += 'index.html'
+        target = os.path.join(dest, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(response.content)
+
+    save(scraper.base_url + '/index.html')
+    home = scraper.get_page(scraper.base_url)
+    for category_url in scraper.parse_category_urls(home)[:max_categories]:
+        page_num = 1
+        while True:
+            url = listing_page_url(category_url, page_num)
+            soup = scraper.get_page(url)
+            if not soup:
+                break
+            save(url)
+            for book_url in scraper.parse_book_links(soup):
+                save(book_url)
+            if not scraper.has_next_page(soup):
+                break
+            page_num += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    mirror = sub.add_parser('mirror', help='Save pages from the live site')
+    mirror.add_argument('dest')
+    mirror.add_argument('--categories', type=int, default=2)
+    serve = sub.add_parser('serve', help='Serve a saved site')
+    serve.add_argument('root')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help='Seconds added to each response')
+    serve.add_argument('--jitter', type=float, default=0.0, help='Random extra latency, up to this')
+    serve.add_argument('--error-rate', type=float, default=0.0,
+                       help='Fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    if args.command == 'mirror':
+        mirror_site(args.dest, args.categories)
+    else:
+        server = FixtureServer(args.root, port=args.port, latency=args.latency,
+                               jitter=args.jitter, error_rate=args.error_rate)
+        print(f"Serving {args.root} at {server.base_url}")
+        server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
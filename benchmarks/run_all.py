@@ -0,0 +1,195 @@
+"""Run the offline benchmark suite and compare it with a previous run.
+
+A synthetic catalogue is generated and served locally, then five
+benchmarks are run: end-to-end crawl, product-page parsing, database
+upserts, exports and command start-up. Results are saved as JSON under benchmarks/results/
+(or --output). With --compare, any metric more than --tolerance below the
+baseline is reported and the exit status is 1.
+
+    python benchmarks/run_all.py --categories 5 --books 40 --latency 0.01
+    python benchmarks/run_all.py --compare benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+sys.path.insert(0, ROOT)
+
+# The crawl benchmark measures the scraper, not politeness delays or cache
+# hits; these must be set before config is imported
+os.environ.setdefault('PER_HOST_RATE_LIMIT', '1000')
+os.environ.setdefault('MAX_RATE', '1000')
+os.environ.setdefault('MAX_IN_FLIGHT_PER_HOST', '64')
+os.environ['HTTP_CACHE'] = '0'
+WORK_DIR = tempfile.mkdtemp(prefix='scraper-bench-')
+os.environ['SQLITE_PATH'] = f"sqlite:///{os.path.join(WORK_DIR, 'crawl.db')}"
+
+from bench_db_write import run as run_db_write  # noqa: E402
+from bench_export import build_table, measure_export  # noqa: E402
+from bench_parsers import bench as bench_parser, load_product_pages  # noqa: E402
+from bench_startup import run as run_startup  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+from synthetic_site import generate_site  # noqa: E402
+
+
+def bench_crawl(site: str, args) -> dict:
+    """Books per second for the sync and async crawlers over the fixture server."""
+    from async_scraper import AsyncBookScraper
+    from models import Book, SessionLocal, init_db
+    from scraper import BookScraper
+
+    init_db()
+    results = {}
+    with FixtureServer(site, latency=args.latency, error_rate=args.error_rate) as server:
+        for name, cls in (('crawl_sync', BookScraper), ('crawl_async', AsyncBookScraper)):
+            db = SessionLocal()
+            db.query(Book).delete()
+            db.commit()
+            scraper = cls(server.base_url)
+            scraper.csv_path = os.path.join(WORK_DIR, f"{name}.csv")
+            start = time.perf_counter()
+            scraper.scrape_all_books()
+            elapsed = time.perf_counter() - start
+            results[f"{name}_books_per_sec"] = db.query(Book).count() / elapsed
+            db.close()
+    return results
+
+
+def bench_parse(site: str, repeat: int) -> dict:
+    from parsers import PARSERS
+
+    pages = load_product_pages(site)
+    return {f"parse_{name}_pages_per_sec": bench_parser(pages, cls(), repeat)
+            for name, cls in PARSERS.items()}
+
+
+def bench_db(rows: int) -> dict:
+    from persistence import upsert_books
+
+    inserts, updates = run_db_write(upsert_books, rows, 500)
+    return {'db_upsert_inserts_per_sec': inserts, 'db_upsert_updates_per_sec': updates}
+
+
+def bench_exports(rows: int, formats) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'export.db')
+        build_table(db_path, rows)
+        for fmt in formats:
+            elapsed, _ = measure_export(db_path, fmt, tmp)
+            results[f"export_{fmt}_rows_per_sec"] = rows / elapsed
+    return results
+
+
+def bench_startup() -> dict:
+    """Command start-ups per second, so that lower is worse like every other metric."""
+    timings = run_startup(repeat=3)
+    return {f"startup_{name.replace(' ', '_').replace('-', '')}_per_sec": 1000 / ms
+            for name, ms in timings.items() if name.startswith('cli')}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each metric next to the baseline; return the regressed names.
+
+    Every metric is a throughput, so lower than baseline is worse.
+    """
+    regressions = []
+    for name, value in results.items():
+        old = baseline.get(name)
+        if not old:
+            print(f"{name:>36}: {value:12.1f}  (new)")
+            continue
+        change = (value - old) / old
+        flag = ''
+        if change < -tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:>36}: {value:12.1f}  baseline {old:12.1f}  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--books', type=int, default=40, help='Books per category')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--parse-repeat', type=int, default=3)
+    parser.add_argument('--db-rows', type=int, default=10000)
+    parser.add_argument('--export-rows', type=int, default=20000)
+    parser.add_argument('--export-formats', nargs='+', default=['csv', 'xlsx', 'parquet'])
+    parser.add_argument('--only', nargs='+',
+                        choices=['crawl', 'parse', 'db', 'export', 'startup'],
+                        default=['crawl', 'parse', 'db', 'export', 'startup'])
+    parser.add_argument('--output', help='Results file (default: results/<timestamp>.json)')
+    parser.add_argument('--compare', help='Baseline results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed slowdown before a metric counts as a regression')
+    args = parser.parse_args()
+
+    site = os.path.join(WORK_DIR, 'site')
+    results = {}
+    try:
+        generate_site(site, args.categories, args.books)
+        if 'crawl' in args.only:
+            results.update(bench_crawl(site, args))
+        if 'parse' in args.only:
+            results.update(bench_parse(site, args.parse_repeat))
+        if 'db' in args.only:
+            results.update(bench_db(args.db_rows))
+        if 'export' in args.only:
+            results.update(bench_exports(args.export_rows, args.export_formats))
+        if 'startup' in args.only:
+            results.update(bench_startup())
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'params': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'results': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != run['params']:
+            print("Warning: baseline was run with different parameters")
+        regressions = compare(results, baseline['results'], args.tolerance)
+    else:
+        for name, value in results.items():
+            print(f"{name:>36}: {value:12.1f}")
+    print(f"Results written to {output}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Generate a synthetic books.toscrape.com catalogue for offline benchmarks.
+
+Pages follow the live site's layout and markup closely enough for
+BookScraper's listing, pagination and product-page parsing:
+
+    index.html                                   home page with the category sidebar
+    catalogue/category/books/<slug>/index.html   listing, 20 books per page
+    catalogue/category/books/<slug>/page-N.html
+    catalogue/page-N.html                        index of every book, 20 per page
+    catalogue/<book-slug>/index.html             product page
+
+    python benchmarks/synthetic_site.py fixtures/synthetic --categories 10 --books 100
+"""
+import argparse
+import os
+import random
+from html import escape
+
+RATINGS = ('One', 'Two', 'Three', 'Four', 'Five')
+PER_PAGE = 20
+WORDS = ('river', 'light', 'garden', 'winter', 'secret', 'house', 'night', 'story',
+         'journey', 'silent', 'city', 'summer', 'shadow', 'letter', 'island', 'glass')
+
+PAGE = """<!DOCTYPE html>
+<html lang="en-us" class="no-js">
+<head><meta charset="utf-8"><title>{title} | Books to Scrape - Sandbox</title></head>
+<body id="default" class="default">
+<div class="container-fluid page"><div class="page_inner">
+{breadcrumb}
+<div class="row">
+<aside class="sidebar col-sm-4 col-md-3">{sidebar}</aside>
+<div class="col-sm-8 col-md-9">{content}</div>
+</div></div></div>
+</body></html>
+"""
+
+PRODUCT = """<article class="product_page">
+<div class="row">
+<div class="col-sm-6 product_main">
+<h1>{title}</h1>
+<p class="price_color">£{price:.2f}</p>
+<p class="instock availability"><i class="icon-ok"></i> {availability}</p>
+<p class="star-rating {rating}"><i class="icon-star"></i></p>
+</div></div>
+<div id="product_description" class="sub-header"><h2>Product Description</h2></div>
+<p>{description}</p>
+<div class="sub-header"><h2>Product Information</h2></div>
+<table class="table table-striped">
+<tr><th>UPC</th><td>{upc}</td></tr>
+<tr><th>Product Type</th><td>Books</td></tr>
+<tr><th>Price (excl. tax)</th><td>£{price:.2f}</td></tr>
+<tr><th>Price (incl. tax)</th><td>£{price:.2f}</td></tr>
+<tr><th>Tax</th><td>£0.00</td></tr>
+<tr><th>Availability</th><td>{availability}</td></tr>
+<tr><th>Number of reviews</th><td>{reviews}</td></tr>
+</table>
+</article>"""
+
+POD = """<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">
+<div class="image_container"><a href="{prefix}{slug}/index.html"><img src="x.jpg" alt="{title}" class="thumbnail"></a></div>
+<p class="star-rating {rating}"><i class="icon-star"></i></p>
+<h3><a href="{prefix}{slug}/index.html" title="{title}">{short_title}</a></h3>
+<div class="product_price"><p class="price_color">£{price:.2f}</p>
+<p class="instock availability"><i class="icon-ok"></i> {stock_label}</p></div>
+</article></li>"""
+
+
+def write(root: str, path: str, text: str):
+    target = os.path.join(root, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def sidebar(categories, prefix: str) -> str:
+    links = ''.join(f'<li><a href="{prefix}catalogue/category/books/{slug}/index.html">{name}</a></li>'
+                    for name, slug in categories)
+    return (f'<div class="side_categories"><ul class="nav nav-list"><li>'
+            f'<a href="{prefix}catalogue/category/books_1/index.html">Books</a>'
+            f'<ul>{links}</ul></li></ul></div>')
+
+
+def pager(page: int, pages: int) -> str:
+    """The listing pager: "Page X of N" plus previous/next links."""
+    if pages == 1:
+        return ''
+    links = f'<li class="current">Page {page} of {pages}</li>'
+    if page > 1:
+        links = f'<li class="previous"><a href="page-{page - 1}.html">previous</a></li>' + links
+    if page < pages:
+        links += f'<li class="next"><a href="page-{page + 1}.html">next</a></li>'
+    return f'<ul class="pager">{links}</ul>'
+
+
+def generate_site(root: str, categories: int = 5, books_per_category: int = 50,
+                  seed: int = 0, description_words: int = 120) -> int:
+    """Write a synthetic catalogue under `root`; returns the number of books."""
+    rng = random.Random(seed)
+    cats = [(f"Category {i}", f"category-{i}_{i + 2}") for i in range(categories)]
+    book_id = 0
+    index_pods = []
+    for name, slug in cats:
+        pages = max((books_per_category + PER_PAGE - 1) // PER_PAGE, 1)
+        for page in range(1, pages + 1):
+            pods = []
+            for _ in range(min(PER_PAGE, books_per_category - (page - 1) * PER_PAGE)):
+                book_id += 1
+                title = ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 6)))
+                title = escape(f"{title} {book_id}")
+                book_slug = f"book-{book_id}_{book_id}"
+                price = rng.randint(1000, 5999) / 100
+                stock = rng.randint(0, 22)
+                book = {
+                    'title': title, 'price': price, 'rating': rng.choice(RATINGS),
+                    'availability': f"In stock ({stock} available)" if stock else 'Out of stock',
+                    'description': ' '.join(rng.choice(WORDS) for _ in range(description_words)),
+                    'upc': f"{rng.getrandbits(64):016x}", 'reviews': rng.randint(0, 5),
+                }
+                breadcrumb = ('<ul class="breadcrumb"><li><a href="../../index.html">Home</a></li>'
+                              '<li><a href="../category/books_1/index.html">Books</a></li>'
+                              f'<li><a href="../category/books/{slug}/index.html">{name}</a></li>'
+                              f'<li class="active">{title}</li></ul>')
+                write(root, f"catalogue/{book_slug}/index.html", PAGE.format(
+                    title=title, breadcrumb=breadcrumb, sidebar='',
+                    content=PRODUCT.format(**book)))
+                pod = dict(book, slug=book_slug, short_title=title[:40],
+                           stock_label='In stock' if stock else 'Out of stock')
+                pods.append(POD.format(prefix='../../../', **pod))
+                index_pods.append(POD.format(prefix='', **pod))
+            listing = f'<section><ol class="row">{"".join(pods)}</ol>{pager(page, pages)}</section>'
+            breadcrumb = ('<ul class="breadcrumb"><li><a href="../../../../index.html">Home</a></li>'
+                          f'<li class="active">{name}</li></ul>')
+            filename = 'index.html' if page == 1 else f'page-{page}.html'
+            write(root, f"catalogue/category/books/{slug}/{filename}", PAGE.format(
+                title=name, breadcrumb=breadcrumb, sidebar=sidebar(cats, '../../../../'),
+                content=listing))
+    pages = max((len(index_pods) + PER_PAGE - 1) // PER_PAGE, 1)
+    for page in range(1, pages + 1):
+        pods = index_pods[(page - 1) * PER_PAGE:page * PER_PAGE]
+        listing = f'<section><ol class="row">{"".join(pods)}</ol>{pager(page, pages)}</section>'
+        breadcrumb = ('<ul class="breadcrumb"><li><a href="../index.html">Home</a></li>'
+                      '<li class="active">All products</li></ul>')
+        write(root, f"catalogue/page-{page}.html", PAGE.format(
+            title='All products', breadcrumb=breadcrumb, sidebar=sidebar(cats, '../'),
+            content=listing))
+    write(root, 'index.html', PAGE.format(
+        title='All products', breadcrumb='', sidebar=sidebar(cats, ''), content=''))
+    return book_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root')
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--books', type=int, default=50, help='Books per category')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    total = generate_site(args.root, args.categories, args.books, args.seed)
+    print(f"Wrote {total} books in {args.categories} categories to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Books to Scrape command line: scrape, export, stats and gui.
+
+Each subcommand imports what it needs when it runs, so cheap commands
+(`stats` on a SQLite database, `--help`) never load SQLAlchemy, pandas,
+bs4 or the HTTP stack.
+
+    python cli.py scrape --incremental
+    python cli.py export --format csv parquet
+    python cli.py stats
+"""
+import argparse
+import sys
+
+from config import TRAVERSAL_STRATEGY
+
+EXPORT_FORMATS = ('csv', 'xlsx', 'parquet', 'arrow')
+
+
+def cmd_scrape(args):
+    from traversal import TraversalError
+
+    try:
+        run_scrape(args)
+    except TraversalError as e:
+        print(f"Crawl failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_scrape(args):
+    from metrics import profile_run
+    from traversal import get_traversal
+
+    traversal = args.traversal or TRAVERSAL_STRATEGY
+    with profile_run():
+        if args.engine == 'async':
+            from async_scraper import AsyncBookScraper
+            scraper = AsyncBookScraper(incremental=args.incremental)
+            scraper.scrape_all_books()
+            return
+        from scraper import BookScraper
+        scraper = BookScraper(incremental=args.incremental)
+        if args.shallow:
+            scraper.scrape_shallow()
+        elif args.engine == 'pipeline':
+            from pipeline import scrape_all_books_pipelined
+            scrape_all_books_pipelined(scraper, get_traversal(traversal))
+        else:
+            scraper.scrape_all_books(get_traversal(traversal))
+
+
+def check_scrape_args(parser: argparse.ArgumentParser, args):
+    """Reject options the chosen crawl would silently ignore."""
+    if args.shallow and args.engine != 'sync':
+        parser.error("--shallow only works with --engine sync")
+    if args.traversal and (args.shallow or args.engine == 'async'):
+        parser.error("--traversal does not apply to --shallow or --engine async crawls, "
+                     "which walk the categories")
+
+
+def cmd_export(args):
+    import export_utils
+
+    exporters = {
+        'csv': export_utils.export_to_csv,
+        'xlsx': export_utils.export_to_excel,
+        'parquet': lambda: export_utils.export_to_parquet(partition_by=args.partition_by),
+        'arrow': export_utils.export_to_arrow,
+    }
+    failed = False
+    for fmt in args.format:
+        path = exporters[fmt]()
+        failed = failed or path is None
+        print(f"{fmt}: {path or 'export failed'}")
+    return 1 if failed else 0
+
+
+def print_stats(stats):
+    print(f"Total books: {stats['total_books']}")
+    print(f"Categories: {stats['categories']}")
+    print(f"Price: min £{stats['min_price']:.2f}, avg £{stats['avg_price']:.2f}, "
+          f"max £{stats['max_price']:.2f}")
+    for row in stats['per_category']:
+        print(f"- {row['category']}: {row['count']} books, avg £{row['avg_price']:.2f}")
+
+
+def cmd_stats(args):
+    if args.search or args.books:
+        import view_data
+        if args.search:
+            view_data.view_search_results(args.search, limit=args.books or 10,
+                                          category=args.category)
+        else:
+            view_data.view_books(limit=args.books, category=args.category)
+        return
+    from config import sqlite_file
+    from stats import sqlite_category_rows, summarize
+
+    path = sqlite_file()
+    rows = sqlite_category_rows(path) if path else None
+    if rows is not None:
+        if args.category:
+            rows = [row for row in rows if row[0] == args.category]
+        print_stats(summarize(rows))
+        return
+    # Not SQLite, or the summary table has to be built: go through the ORM
+    from models import SessionLocal
+    from stats import category_aggregates, get_catalogue_stats
+    db = SessionLocal()
+    try:
+        if args.category:
+            print_stats(summarize(category_aggregates(db, [args.category])))
+        else:
+            print_stats(get_catalogue_stats(db))
+    finally:
+        db.close()
+
+
+def cmd_gui(args):
+    from gui_viewer import main as run_gui
+    run_gui()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    scrape = sub.add_parser('scrape', help='Crawl the catalogue into the database')
+    scrape.add_argument('--engine', choices=['sync', 'async', 'pipeline'], default='sync')
+    scrape.add_argument('--incremental', action='store_true',
+                        help='Skip unchanged pages and only write changed books')
+    scrape.add_argument('--shallow', action='store_true',
+                        help='Listing-only price check (sync engine only)')
+    scrape.add_argument('--traversal', choices=['auto', 'category', 'catalogue'],
+                        help='How books are enumerated by sync and pipeline crawls '
+                             f'(default: {TRAVERSAL_STRATEGY})')
+    scrape.set_defaults(func=cmd_scrape)
+
+    export = sub.add_parser('export', help='Export the books table')
+    export.add_argument('--format', nargs='+', choices=EXPORT_FORMATS, default=['csv'])
+    export.add_argument('--partition-by', choices=['category', 'crawl_date'],
+                        help='Write Parquet as a partitioned dataset')
+    export.set_defaults(func=cmd_export)
+
+    stats = sub.add_parser('stats', help='Catalogue statistics, book listings and search')
+    stats.add_argument('--books', type=int, default=0, help='List this many books')
+    stats.add_argument('--category', help='Limit stats, listings and search to a category')
+    stats.add_argument('--search', help='Full-text search titles and descriptions')
+    stats.set_defaults(func=cmd_stats)
+
+    gui = sub.add_parser('gui', help='Open the Tkinter viewer')
+    gui.set_defaults(func=cmd_gui)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'scrape':
+        check_scrape_args(parser, args)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
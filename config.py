@@ -1,23 +1,177 @@
 import os
-from dotenv import load_dotenv
+from typing import Optional
+
+
+def load_env_file():
+    """Load the nearest .env, searching up from this directory as load_dotenv() does.
+
+    python-dotenv is only imported when there is a file to load, which keeps
+    it off the start-up path of quick commands.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
+
 
 # Load environment variables
-load_dotenv()
+load_env_file()
 
 # Database configuration for SQLite
 DB_CONFIG = {
     'sqlite_path': os.getenv('SQLITE_PATH', 'sqlite:///books_demo.db')
 }
 
+
+def sqlite_file(url: str = DB_CONFIG['sqlite_path']) -> Optional[str]:
+    """The file behind a sqlite:/// database URL; None for other or in-memory URLs."""
+    prefix = 'sqlite:///'
+    if not url.startswith(prefix) or url in (prefix, f'{prefix}:memory:'):
+        return None
+    return url[len(prefix):]
+
+# SQLite storage profile: WAL lets GUI/CLI readers run while a crawl commits
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),  # negative = KiB
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '10000')),
+    'temp_store': 'MEMORY',
+}
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '8'))
+
+# Maintain the category_stats summary table after each crawl batch and serve stats from it
+STATS_SUMMARY = os.getenv('STATS_SUMMARY', '0') == '1'
+
+# Rows per executemany when upserting books
+UPSERT_BATCH_SIZE = int(os.getenv('UPSERT_BATCH_SIZE', '500'))
+
 # Scraping configuration
 BASE_URL = 'https://books.toscrape.com'
 CATALOGUE_URL = f'{BASE_URL}/catalogue'
 
+# Async crawl configuration
+MAX_CONCURRENCY = int(os.getenv('MAX_CONCURRENCY', '10'))
+PER_HOST_RATE_LIMIT = float(os.getenv('PER_HOST_RATE_LIMIT', '5'))  # requests/sec
+
+# HTTP transport: keep-alive pools sized to the crawl's concurrency, timeouts,
+# retries of connection errors and 429/5xx with jittered backoff, optional HTTP/2
+TRANSPORT_CONFIG = {
+    'pool_connections': int(os.getenv('HTTP_POOL_CONNECTIONS', '4')),
+    'pool_maxsize': int(os.getenv('HTTP_POOL_MAXSIZE', str(MAX_CONCURRENCY))),
+    'connect_timeout': float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+    'read_timeout': float(os.getenv('HTTP_READ_TIMEOUT', '30')),
+    'keepalive_timeout': float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '30')),
+    'retries': int(os.getenv('HTTP_RETRIES', '3')),
+    'backoff_factor': float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5')),
+    'backoff_jitter': float(os.getenv('HTTP_BACKOFF_JITTER', '0.5')),
+    'http2': os.getenv('HTTP2', '0') == '1',  # needs httpx[http2]
+}
+
+# Politeness scheduler configuration (per host)
+SCHEDULER_CONFIG = {
+    'requests_per_second': PER_HOST_RATE_LIMIT,
+    'max_in_flight': int(os.getenv('MAX_IN_FLIGHT_PER_HOST', '4')),
+    'burst': float(os.getenv('RATE_LIMIT_BURST', '1')),
+    'min_rate': float(os.getenv('MIN_RATE', '0.2')),
+    'max_rate': float(os.getenv('MAX_RATE', '20')),
+    'slow_response': float(os.getenv('SLOW_RESPONSE_SECONDS', '2')),
+}
+
+# Skip unchanged product pages and only write books whose fields changed
+INCREMENTAL_CRAWL = os.getenv('INCREMENTAL_CRAWL', '0') == '1'
+
+# Shallow crawl: read title/price/rating/stock off listing pages and fetch
+# detail pages only for new books, stale books and (optionally) changes
+SHALLOW_CRAWL = os.getenv('SHALLOW_CRAWL', '0') == '1'
+SHALLOW_CONFIG = {
+    'max_age_days': float(os.getenv('SHALLOW_MAX_AGE_DAYS', '7')),
+    'refetch_on_price_change': os.getenv('SHALLOW_REFETCH_ON_PRICE', '0') == '1',
+    'refetch_on_stock_change': os.getenv('SHALLOW_REFETCH_ON_STOCK', '1') == '1',
+}
+
+# Append each crawl's price/availability changes to book_history (see history.py)
+PRICE_HISTORY = os.getenv('PRICE_HISTORY', '1') == '1'
+
+# How a full crawl enumerates books: 'category' (sidebar, then each category's
+# listing), 'catalogue' (the unified catalogue/page-N.html index, pages fetched
+# in parallel) or 'auto' (the index, falling back to categories)
+TRAVERSAL_STRATEGY = os.getenv('TRAVERSAL_STRATEGY', 'auto')
+INDEX_FETCH_WORKERS = int(os.getenv('INDEX_FETCH_WORKERS', '4'))
+
+# Product page parser backend: 'soup' (BeautifulSoup) or 'lxml' (compiled XPath)
+PARSER_BACKEND = os.getenv('PARSER_BACKEND', 'lxml')
+
+# Pipelined crawl: fetch threads, parser processes and the bound on each hand-off queue
+FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', '4'))
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(os.cpu_count() or 1)))
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '100'))
+
+# Persistent crawl frontier: retries with exponential backoff, stale claims are reclaimed
+FRONTIER_CONFIG = {
+    'max_attempts': int(os.getenv('FRONTIER_MAX_ATTEMPTS', '5')),
+    'backoff_seconds': float(os.getenv('FRONTIER_BACKOFF_SECONDS', '30')),
+    'lease_seconds': float(os.getenv('FRONTIER_LEASE_SECONDS', '300')),
+    'claim_batch': int(os.getenv('FRONTIER_CLAIM_BATCH', '20')),
+}
+
+# HTTP response cache (conditional GETs, optional offline replay)
+HTTP_CACHE_CONFIG = {
+    'enabled': os.getenv('HTTP_CACHE', '1') == '1',
+    'path': os.getenv('HTTP_CACHE_PATH', os.path.join('.cache', 'http_cache.db')),
+    'max_bytes': int(os.getenv('HTTP_CACHE_MAX_MB', '256')) * 1024 * 1024,
+    'offline': os.getenv('HTTP_CACHE_OFFLINE', '0') == '1',
+}
+
+# Crawl metrics: off by default; the port serves Prometheus text, the path
+# receives a JSON snapshot every METRICS_SNAPSHOT_SECONDS and at the end of a crawl
+METRICS_CONFIG = {
+    'enabled': os.getenv('METRICS', '0') == '1',
+    'port': int(os.getenv('METRICS_PORT', '0')),
+    'snapshot_path': os.getenv('METRICS_SNAPSHOT_PATH', ''),
+    'snapshot_seconds': float(os.getenv('METRICS_SNAPSHOT_SECONDS', '30')),
+}
+# Profile a whole crawl: cProfile stats file and/or tracemalloc top allocations
+PROFILE_PATH = os.getenv('PROFILE_PATH', '')
+TRACE_MEMORY = os.getenv('TRACE_MEMORY', '0') == '1'
+
+# Crawl daemon (daemon.py): schedule of full and incremental crawls (0 disables
+# one), optional JSON status endpoint/file, and how long the category list is reused
+DAEMON_CONFIG = {
+    'full_every_hours': float(os.getenv('DAEMON_FULL_EVERY_HOURS', '24')),
+    'incremental_every_minutes': float(os.getenv('DAEMON_INCREMENTAL_EVERY_MINUTES', '60')),
+    'status_port': int(os.getenv('DAEMON_STATUS_PORT', '0')),
+    'status_path': os.getenv('DAEMON_STATUS_PATH', ''),
+    'category_cache_hours': float(os.getenv('DAEMON_CATEGORY_CACHE_HOURS', '24')),
+    'misfire_grace_seconds': int(os.getenv('DAEMON_MISFIRE_GRACE_SECONDS', '300')),
+}
+
+# Viewer query cache (query_cache.py): LRU size, and how often readers re-check the
+# data version the scraper bumps on each commit, i.e. how stale a cached result can get
+QUERY_CACHE_CONFIG = {
+    'enabled': os.getenv('QUERY_CACHE', '1') == '1',
+    'max_entries': int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '256')),
+    'version_check_seconds': float(os.getenv('QUERY_CACHE_CHECK_SECONDS', '1')),
+}
+
 # Export configuration
 EXPORT_DIR = 'exports'
 CSV_DIR = os.path.join(EXPORT_DIR, 'csv')
 EXCEL_DIR = os.path.join(EXPORT_DIR, 'excel')
+PARQUET_DIR = os.path.join(EXPORT_DIR, 'parquet')
+ARROW_DIR = os.path.join(EXPORT_DIR, 'arrow')
+
 
-# Create export directories if they don't exist
-os.makedirs(CSV_DIR, exist_ok=True)
-os.makedirs(EXCEL_DIR, exist_ok=True)
+def ensure_dir(directory: str) -> str:
+    """Create an export directory on first use; returns it."""
+    os.makedirs(directory, exist_ok=True)
+    return directory
@@ -0,0 +1,202 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from config import DAEMON_CONFIG, TRAVERSAL_STRATEGY
+from scraper import BookScraper, csv_filename
+from traversal import AutoTraversal, CategoryTraversal, get_traversal
+
+logger = logging.getLogger(__name__)
+
+# Crawl kinds a daemon schedules
+CRAWL_KINDS = ('full', 'incremental')
+
+
+def warm_traversal(name: str = TRAVERSAL_STRATEGY,
+                   category_max_age: float = DAEMON_CONFIG['category_cache_hours'] * 3600):
+    """A traversal that keeps the category list between crawls."""
+    if name == 'category':
+        return CategoryTraversal(category_max_age)
+    if name == 'auto':
+        return AutoTraversal(category_max_age)
+    return get_traversal(name)
+
+
+class CrawlDaemon:
+    """Run scheduled full and incremental crawls in one long-lived process.
+
+    One BookScraper serves every run, so its HTTP session and connection
+    pools, response cache, politeness scheduler rates and parser stay warm,
+    as do the traversal's category list and the process-wide database pool.
+    Runs never overlap: a crawl that comes due while another is running is
+    skipped.
+    """
+
+    def __init__(self, scraper: Optional[BookScraper] = None, traversal=None,
+                 config: Dict = DAEMON_CONFIG):
+        self.scraper = scraper or BookScraper()
+        self.traversal = traversal or warm_traversal()
+        self.config = config
+        self.lock = threading.Lock()
+        self.scheduler: Optional[BlockingScheduler] = None
+        self.last_runs: Dict[str, Dict] = {}
+        self.last_run: Optional[Dict] = None
+        self.skipped = 0
+
+    def run(self, kind: str) -> Optional[Dict]:
+        """Run one crawl now; returns its stats, or None if one was already running."""
+        if not self.lock.acquire(blocking=False):
+            logger.warning(f"Skipping {kind} crawl: the previous crawl is still running")
+            self.skipped += 1
+            return None
+        try:
+            return self.crawl(kind)
+        finally:
+            self.lock.release()
+            self.write_status()
+
+    def crawl(self, kind: str) -> Dict:
+        scraper = self.scraper
+        scraper.incremental = kind == 'incremental'
+        # Each run gets its own CSV export
+        scraper.csv_path = csv_filename()
+        scraper.csv_initialized = False
+        saved_before = scraper.books_saved
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        error = None
+        logger.info(f"Starting {kind} crawl")
+        try:
+            scraper.scrape_all_books(self.traversal)
+        except Exception as e:
+            logger.exception(f"{kind.title()} crawl failed")
+            error = f"{type(e).__name__}: {e}"
+        duration = time.perf_counter() - start
+        books = scraper.books_saved - saved_before
+        stats = {
+            'kind': kind,
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'duration_seconds': round(duration, 3),
+            'books_saved': books,
+            'books_per_second': round(books / duration, 3) if duration else 0.0,
+            'error': error,
+        }
+        self.last_runs[kind] = self.last_run = stats
+        if error is None:
+            logger.info(f"{kind.title()} crawl finished in {duration:.1f}s: "
+                        f"{books} books saved ({stats['books_per_second']} books/sec)")
+        return stats
+
+    def status(self) -> Dict:
+        next_runs = {}
+        if self.scheduler is not None and self.scheduler.running:
+            next_runs = {job.id: job.next_run_time.isoformat(timespec='seconds')
+                         for job in self.scheduler.get_jobs() if job.next_run_time}
+        return {
+            'running': self.lock.locked(),
+            'last_run': self.last_run,
+            'last_runs': self.last_runs,
+            'skipped_runs': self.skipped,
+            'next_runs': next_runs,
+        }
+
+    def write_status(self):
+        path = self.config['status_path']
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.status(), f, indent=2)
+        except OSError as e:
+            logger.error(f"Could not write daemon status: {e}")
+
+    def serve_status(self, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+        """Serve status() as JSON on http://host:port/ from a daemon thread."""
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(daemon.status(), indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"Serving daemon status on http://{host}:{server.server_address[1]}/")
+        return server
+
+    def build_scheduler(self, run_now: bool = False) -> BlockingScheduler:
+        """One interval job per crawl kind; a job never runs twice at once.
+
+        Missed runs (the process was busy or suspended) are coalesced into
+        one, and dropped if more than misfire_grace_seconds late.
+        """
+        scheduler = BlockingScheduler(job_defaults={
+            'max_instances': 1,
+            'coalesce': True,
+            'misfire_grace_time': self.config['misfire_grace_seconds'],
+        })
+        intervals = {'full': ('hours', self.config['full_every_hours']),
+                     'incremental': ('minutes', self.config['incremental_every_minutes'])}
+        for kind, (unit, every) in intervals.items():
+            if not every:
+                continue
+            options = {'next_run_time': datetime.now()} if run_now and kind == 'full' else {}
+            scheduler.add_job(self.run, 'interval', args=[kind], id=kind, name=f"{kind} crawl",
+                              **{unit: every}, **options)
+        self.scheduler = scheduler
+        return scheduler
+
+    def start(self, run_now: bool = False):
+        """Serve status if configured and block running the schedule."""
+        if self.config['status_port']:
+            self.serve_status(self.config['status_port'])
+        scheduler = self.build_scheduler(run_now)
+        if not scheduler.get_jobs():
+            logger.error("No crawls scheduled; set DAEMON_FULL_EVERY_HOURS or "
+                         "DAEMON_INCREMENTAL_EVERY_MINUTES")
+            return
+        try:
+            scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            logger.info("Crawl daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run scheduled crawls in one warm process')
+    parser.add_argument('--full-hours', type=float, default=DAEMON_CONFIG['full_every_hours'],
+                        help='Hours between full crawls (0 disables them)')
+    parser.add_argument('--incremental-minutes', type=float,
+                        default=DAEMON_CONFIG['incremental_every_minutes'],
+                        help='Minutes between incremental crawls (0 disables them)')
+    parser.add_argument('--status-port', type=int, default=DAEMON_CONFIG['status_port'])
+    parser.add_argument('--run-now', action='store_true', help='Start with a full crawl')
+    parser.add_argument('--once', choices=CRAWL_KINDS,
+                        help='Run a single crawl of this kind and exit')
+    args = parser.parse_args()
+
+    config = dict(DAEMON_CONFIG, full_every_hours=args.full_hours,
+                  incremental_every_minutes=args.incremental_minutes,
+                  status_port=args.status_port)
+    daemon = CrawlDaemon(config=config)
+    if args.once:
+        daemon.run(args.once)
+        return
+    daemon.start(run_now=args.run_now)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+from config import BASE_URL, PRICE_HISTORY, SCHEDULER_CONFIG
+from frontier import CrawlFrontier, default_worker_id
+from history import close_crawl, open_crawl
+from models import SessionLocal
+from rate_limiter import PolitenessScheduler
+
+logger = logging.getLogger(__name__)
+
+# URL kinds handled by the coordinator; workers only claim product pages
+DISCOVERY_KINDS = ('home', 'listing')
+WORKER_KINDS = ('book',)
+# Seconds the coordinator waits when discovery URLs are backing off
+DISCOVERY_IDLE_SECONDS = 1
+
+
+def worker_scheduler(workers: int) -> PolitenessScheduler:
+    """A scheduler allowed an equal share of the per-host rate limit.
+
+    Each process has its own scheduler, so the configured rates are split
+    between processes to keep the crawl as a whole within them.
+    """
+    workers = max(workers, 1)
+    return PolitenessScheduler.from_config(
+        requests_per_second=SCHEDULER_CONFIG['requests_per_second'] / workers,
+        max_rate=SCHEDULER_CONFIG['max_rate'] / workers,
+        max_in_flight=max(SCHEDULER_CONFIG['max_in_flight'] // workers, 1),
+    )
+
+
+class Coordinator:
+    """Discovers categories and listing pages and enqueues product URLs."""
+
+    def __init__(self, scraper, frontier: CrawlFrontier):
+        self.scraper = scraper
+        self.frontier = frontier
+
+    def run(self) -> int:
+        """Walk home and listing pages until none are left; returns pages expanded."""
+        frontier = self.frontier
+        frontier.reclaim_stale()
+        frontier.add([self.scraper.base_url], 'home')
+        stop_heartbeat = frontier.start_heartbeat()
+        expanded = 0
+        try:
+            while True:
+                items = frontier.claim(kinds=DISCOVERY_KINDS)
+                if not items:
+                    if not frontier.has_work(DISCOVERY_KINDS):
+                        break
+                    time.sleep(DISCOVERY_IDLE_SECONDS)
+                    frontier.reclaim_stale()
+                    continue
+                for item in items:
+                    html = self.scraper.fetch_html(item.url)
+                    if html is None:
+                        frontier.fail(item, 'fetch failed')
+                        continue
+                    self.scraper.expand_frontier(frontier, item, BeautifulSoup(html, 'html.parser'))
+                    frontier.complete([item])
+                    expanded += 1
+        finally:
+            stop_heartbeat.set()
+        logger.info(f"Discovery finished after {expanded} pages: {frontier.counts()}")
+        return expanded
+
+
+def run_coordinator(base_url: str = BASE_URL, workers: int = 1):
+    from scraper import BookScraper
+
+    scraper = BookScraper(base_url, scheduler=worker_scheduler(workers + 1))
+    frontier = CrawlFrontier(worker_id=f"{default_worker_id()}/coordinator")
+    return Coordinator(scraper, frontier).run()
+
+
+def run_worker(index: int = 0, base_url: str = BASE_URL, workers: int = 1,
+               crawl_id: Optional[int] = None):
+    """Claim, fetch, parse and write product pages until the crawl is done.
+
+    A worker started before the coordinator waits for it to enqueue URLs.
+    Price history is recorded under `crawl_id`; without one the worker
+    opens a crawl of its own.
+    """
+    from scraper import BookScraper, csv_filename
+
+    scraper = BookScraper(base_url, scheduler=worker_scheduler(workers + 1))
+    # Workers append to their own CSV so batches never interleave
+    scraper.csv_path = csv_filename().replace('.csv', f'_worker{index}_{os.getpid()}.csv')
+    frontier = CrawlFrontier(worker_id=f"{default_worker_id()}/worker{index}")
+    scraper.scrape_frontier(frontier, kinds=list(WORKER_KINDS), crawl_id=crawl_id)
+
+
+def _start(target, *args) -> multiprocessing.Process:
+    # Spawned processes build their own engine rather than inheriting pooled connections
+    process = multiprocessing.get_context('spawn').Process(target=target, args=args)
+    process.start()
+    return process
+
+
+def crawl_distributed(workers: int, base_url: str = BASE_URL, fresh: bool = False,
+                      frontier: Optional[CrawlFrontier] = None) -> float:
+    """Run a coordinator and `workers` worker processes on this host.
+
+    Returns the elapsed seconds. Workers on other hosts can join the same
+    crawl with `python distributed.py worker` against a shared database.
+    """
+    frontier = frontier or CrawlFrontier()
+    if fresh:
+        frontier.reset()
+    # One price history crawl for the whole run, not one per worker
+    crawl_id = None
+    db = SessionLocal(bind=frontier.engine)
+    try:
+        if PRICE_HISTORY:
+            crawl_id = open_crawl(db)
+            logger.info(f"Recording price history as crawl {crawl_id}")
+        start = time.perf_counter()
+        processes: List[multiprocessing.Process] = [_start(run_coordinator, base_url, workers)]
+        processes += [_start(run_worker, index, base_url, workers, crawl_id)
+                      for index in range(workers)]
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                logger.error(f"{process.name} exited with code {process.exitcode}")
+        if crawl_id is not None:
+            close_crawl(db, crawl_id)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+    logger.info(f"Distributed crawl with {workers} workers took {elapsed:.1f}s: "
+                f"{frontier.counts()}")
+    return elapsed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Coordinator/worker crawl over a shared frontier")
+    parser.add_argument('role', choices=['run', 'coordinator', 'worker'],
+                        help="'run' starts a coordinator and local workers")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes in the whole crawl (sets each rate share)')
+    parser.add_argument('--index', type=int, default=0, help='Worker number, for CSV names')
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--fresh', action='store_true',
+                        help='Discard the saved frontier and start a new crawl')
+    parser.add_argument('--crawl-id', type=int,
+                        help="Price history crawl a worker joins ('run' opens one itself)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.role == 'run':
+        crawl_distributed(args.workers, args.base_url, fresh=args.fresh)
+        return
+    if args.fresh:
+        CrawlFrontier().reset()
+    if args.role == 'coordinator':
+        run_coordinator(args.base_url, args.workers)
+    else:
+        run_worker(args.index, args.base_url, args.workers, args.crawl_id)
+
+
+if __name__ == "__main__":
+    main()
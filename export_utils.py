@@ -1,111 +1,290 @@
-import pandas as pd
+import csv
+import os
 from datetime import datetime
-from models import SessionLocal, Book
-from config import CSV_DIR, EXCEL_DIR
+from typing import Iterator, List, Optional
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select
+from models import Book, get_engine
+from config import ARROW_DIR, CSV_DIR, EXCEL_DIR, PARQUET_DIR, ensure_dir
 import logging
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow exports are optional
+    pa = None
+
 logger = logging.getLogger(__name__)
 
+# Rows fetched from the database per round trip
+CHUNK_SIZE = 5000
+# Excel's hard limit is 1,048,576 rows per sheet, including the header
+EXCEL_MAX_ROWS = 1048575
+
+EXPORT_COLUMNS = [
+    ('Title', Book.title),
+    ('Price', Book.price),
+    ('Availability', Book.availability),
+    ('Rating', Book.rating),
+    ('Category', Book.category),
+    ('Description', Book.description),
+    ('UPC', Book.upc),
+    ('Product Type', Book.product_type),
+    ('Price (excl. tax)', Book.price_excl_tax),
+    ('Price (incl. tax)', Book.price_incl_tax),
+    ('Tax', Book.tax),
+    ('Number of Reviews', Book.num_reviews),
+    ('In Stock', Book.in_stock),
+    ('Last Updated', Book.updated_at),
+]
+EXPORT_HEADERS = [header for header, _ in EXPORT_COLUMNS]
+
+
+def iter_book_chunks(conn, chunk_size: int = CHUNK_SIZE) -> Iterator[List[tuple]]:
+    """Stream the books table as lists of plain Core rows.
+
+    Rows are read with a streaming cursor, `chunk_size` at a time, without
+    building ORM objects, so memory stays constant regardless of table size.
+    """
+    stmt = select(*(column for _, column in EXPORT_COLUMNS)).order_by(Book.id)
+    result = conn.execution_options(yield_per=chunk_size).execute(stmt)
+    for partition in result.partitions():
+        yield partition
 
-def export_to_csv():
+
+def export_filepath(directory: str, extension: str) -> str:
+    """Generate filename with timestamp."""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f'{ensure_dir(directory)}/books_export_{timestamp}.{extension}'
+
+
+def export_to_csv(filepath: Optional[str] = None) -> Optional[str]:
     """Export all books to a CSV file."""
+    filepath = filepath or export_filepath(CSV_DIR, 'csv')
+    total = 0
     try:
-        db = SessionLocal()
-        books = db.query(Book).all()
-
-        # Convert to DataFrame
-        data = []
-        for book in books:
-            data.append({
-                'Title': book.title,
-                'Price': book.price,
-                'Availability': book.availability,
-                'Rating': book.rating,
-                'Category': book.category,
-                'Description': book.description,
-                'UPC': book.upc,
-                'Product Type': book.product_type,
-                'Price (excl. tax)': book.price_excl_tax,
-                'Price (incl. tax)': book.price_incl_tax,
-                'Tax': book.tax,
-                'Number of Reviews': book.num_reviews,
-                'In Stock': book.in_stock,
-                'Last Updated': book.updated_at
-            })
-
-        df = pd.DataFrame(data)
-
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'books_export_{timestamp}.csv'
-        filepath = f'{CSV_DIR}/{filename}'
-
-        # Export to CSV
-        df.to_csv(filepath, index=False)
-        logger.info(f"Successfully exported {len(books)} books to {filepath}")
+        with get_engine().connect() as conn, open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_HEADERS)
+            for rows in iter_book_chunks(conn):
+                writer.writerows(rows)
+                total += len(rows)
+        logger.info(f"Successfully exported {total} books to {filepath}")
+        return filepath
 
     except Exception as e:
         logger.error(f"Error exporting to CSV: {str(e)}")
-    finally:
-        db.close()
+        return None
+
+
+def column_widths(rows: List[tuple]) -> List[int]:
+    """Estimate column widths from the header and a sample of rows."""
+    widths = [len(header) for header in EXPORT_HEADERS]
+    for row in rows:
+        for idx, value in enumerate(row):
+            widths[idx] = max(widths[idx], len(str(value)))
+    return widths
 
 
-def export_to_excel():
-    """Export all books to an Excel file."""
+def export_to_excel(filepath: Optional[str] = None) -> Optional[str]:
+    """Export all books to an Excel file.
+
+    Uses openpyxl's write-only mode, which streams rows to disk instead of
+    keeping every cell in memory. Column widths are sized from the first
+    chunk of rows, since write-only sheets need them before any row is written.
+    """
+    filepath = filepath or export_filepath(EXCEL_DIR, 'xlsx')
+    total = 0
     try:
-        db = SessionLocal()
-        books = db.query(Book).all()
-
-        # Convert to DataFrame
-        data = []
-        for book in books:
-            data.append({
-                'Title': book.title,
-                'Price': book.price,
-                'Availability': book.availability,
-                'Rating': book.rating,
-                'Category': book.category,
-                'Description': book.description,
-                'UPC': book.upc,
-                'Product Type': book.product_type,
-                'Price (excl. tax)': book.price_excl_tax,
-                'Price (incl. tax)': book.price_incl_tax,
-                'Tax': book.tax,
-                'Number of Reviews': book.num_reviews,
-                'In Stock': book.in_stock,
-                'Last Updated': book.updated_at
-            })
-
-        df = pd.DataFrame(data)
-
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'books_export_{timestamp}.xlsx'
-        filepath = f'{EXCEL_DIR}/{filename}'
-
-        # Export to Excel
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Books')
-
-            # Auto-adjust columns' width
-            worksheet = writer.sheets['Books']
-            for idx, col in enumerate(df.columns):
-                max_length = max(
-                    df[col].astype(str).apply(len).max(),
-                    len(col)
-                )
-                worksheet.column_dimensions[chr(
-                    65 + idx)].width = max_length + 2
-
-        logger.info(f"Successfully exported {len(books)} books to {filepath}")
+        workbook = Workbook(write_only=True)
+        worksheet = None
+        sheet_rows = 0
+        with get_engine().connect() as conn:
+            for rows in iter_book_chunks(conn):
+                for row in rows:
+                    if worksheet is None or sheet_rows >= EXCEL_MAX_ROWS:
+                        title = 'Books' if worksheet is None else f'Books ({len(workbook.worksheets) + 1})'
+                        worksheet = workbook.create_sheet(title)
+                        # Auto-adjust columns' width (Excel caps widths at 255)
+                        for idx, width in enumerate(column_widths(rows)):
+                            worksheet.column_dimensions[get_column_letter(
+                                idx + 1)].width = min(width + 2, 255)
+                        worksheet.append(EXPORT_HEADERS)
+                        sheet_rows = 0
+                    worksheet.append(tuple(row))
+                    sheet_rows += 1
+                total += len(rows)
+        if worksheet is None:
+            workbook.create_sheet('Books').append(EXPORT_HEADERS)
+        workbook.save(filepath)
+
+        logger.info(f"Successfully exported {total} books to {filepath}")
+        return filepath
 
     except Exception as e:
         logger.error(f"Error exporting to Excel: {str(e)}")
-    finally:
-        db.close()
+        return None
+
+
+# Columnar snapshot schema; low-cardinality strings are dictionary encoded
+SNAPSHOT_COLUMNS = [
+    ('title', Book.title), ('price', Book.price), ('availability', Book.availability),
+    ('rating', Book.rating), ('category', Book.category), ('description', Book.description),
+    ('upc', Book.upc), ('product_type', Book.product_type),
+    ('price_excl_tax', Book.price_excl_tax), ('price_incl_tax', Book.price_incl_tax),
+    ('tax', Book.tax), ('num_reviews', Book.num_reviews), ('in_stock', Book.in_stock),
+    ('updated_at', Book.updated_at),
+]
+DICTIONARY_COLUMNS = {'rating', 'category', 'product_type'}
+PARTITION_COLUMNS = ('category', 'crawl_date')
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet and Arrow exports require pyarrow")
+
+
+def snapshot_schema():
+    """Arrow schema of a catalogue snapshot, plus the derived crawl_date."""
+    require_pyarrow()
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('title', pa.string()),
+        ('price', pa.float64()),
+        ('availability', pa.int32()),
+        ('rating', dictionary),
+        ('category', dictionary),
+        ('description', pa.string()),
+        ('upc', pa.string()),
+        ('product_type', dictionary),
+        ('price_excl_tax', pa.float64()),
+        ('price_incl_tax', pa.float64()),
+        ('tax', pa.float64()),
+        ('num_reviews', pa.int32()),
+        ('in_stock', pa.bool_()),
+        ('updated_at', pa.timestamp('us')),
+        ('crawl_date', pa.date32()),
+    ])
+
+
+def snapshot_dictionaries(conn) -> dict:
+    """The distinct values of each dictionary column, over the whole table.
+
+    The Arrow IPC file format allows one dictionary per field, so every batch
+    is encoded against these rather than against its own values.
+    """
+    return {
+        name: pa.array(sorted(conn.execute(
+            select(column).distinct().where(column.is_not(None))).scalars()), pa.string())
+        for name, column in SNAPSHOT_COLUMNS if name in DICTIONARY_COLUMNS
+    }
+
+
+def dictionary_array(values, dictionary):
+    """Encode `values` against a fixed `dictionary`."""
+    values = pa.array(values, pa.string())
+    indices = pc.index_in(values, value_set=dictionary).cast(pa.int32())
+    if indices.null_count != values.null_count:
+        raise ValueError("Books table changed during the export; run it again")
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+def iter_record_batches(conn, schema, chunk_size: int = CHUNK_SIZE):
+    """Stream the books table as typed Arrow record batches."""
+    dictionaries = snapshot_dictionaries(conn)
+    stmt = select(*(column for _, column in SNAPSHOT_COLUMNS)).order_by(Book.id)
+    result = conn.execution_options(yield_per=chunk_size).execute(stmt)
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        arrays = []
+        for (name, _), values in zip(SNAPSHOT_COLUMNS, columns):
+            field = schema.field(name)
+            if name in DICTIONARY_COLUMNS:
+                arrays.append(dictionary_array(values, dictionaries[name]))
+            else:
+                arrays.append(pa.array(values, field.type))
+        updated_at = columns[-1]
+        arrays.append(pa.array([value.date() if value else None for value in updated_at],
+                               pa.date32()))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_to_parquet(path: Optional[str] = None,
+                      partition_by: Optional[str] = None) -> Optional[str]:
+    """Export all books to Parquet.
+
+    Without `partition_by` a single file is written; with 'category' or
+    'crawl_date' a hive-partitioned directory (`category=Travel/...`) is written.
+    """
+    if partition_by is not None and partition_by not in PARTITION_COLUMNS:
+        raise ValueError(f"Cannot partition by {partition_by}")
+    try:
+        schema = snapshot_schema()
+        if partition_by:
+            path = path or export_filepath(PARQUET_DIR, 'parquet').replace('.parquet', '')
+            with get_engine().connect() as conn:
+                ds.write_dataset(
+                    iter_record_batches(conn, schema), path, schema=schema, format='parquet',
+                    partitioning=ds.partitioning(
+                        pa.schema([schema.field(partition_by)]), flavor='hive'),
+                    existing_data_behavior='overwrite_or_ignore')
+        else:
+            path = path or export_filepath(PARQUET_DIR, 'parquet')
+            with get_engine().connect() as conn, pq.ParquetWriter(path, schema) as writer:
+                for batch in iter_record_batches(conn, schema):
+                    writer.write_batch(batch)
+        logger.info(f"Successfully exported books to {path}")
+        return path
+
+    except Exception as e:
+        logger.error(f"Error exporting to Parquet: {str(e)}")
+        return None
+
+
+def export_to_arrow(path: Optional[str] = None) -> Optional[str]:
+    """Export all books to an Arrow IPC file for memory-mapped reloads."""
+    path = path or export_filepath(ARROW_DIR, 'arrow')
+    try:
+        schema = snapshot_schema()
+        with get_engine().connect() as conn, pa.ipc.new_file(path, schema) as writer:
+            for batch in iter_record_batches(conn, schema):
+                writer.write_batch(batch)
+        logger.info(f"Successfully exported books to {path}")
+        return path
+
+    except Exception as e:
+        logger.error(f"Error exporting to Arrow: {str(e)}")
+        return None
+
+
+def load_snapshot(path: str, columns: Optional[List[str]] = None):
+    """Load a Parquet or Arrow snapshot into a pandas DataFrame.
+
+    Arrow IPC files are memory-mapped, so numeric columns are not copied
+    until pandas needs them. Partitioned Parquet directories are read as
+    one dataset with the partition column restored.
+    """
+    require_pyarrow()
+    if path.endswith(('.arrow', '.feather')):
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns:
+            table = table.select(columns)
+    elif os.path.isdir(path):
+        partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+        table = ds.dataset(path, format='parquet',
+                           partitioning=partitioning).to_table(columns=columns)
+    else:
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
 
 
 if __name__ == "__main__":
     # Example usage
     export_to_csv()
     export_to_excel()
+    if pa is not None:
+        export_to_parquet()
@@ -0,0 +1,198 @@
+import logging
+import os
+import random
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import func, select, update
+
+from config import FRONTIER_CONFIG
+from models import FrontierURL, get_engine
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+FAILED = 'failed'
+
+# Crawl depth-first: finish known books before discovering more listing pages
+PRIORITIES = {'home': 0, 'listing': 1, 'book': 2}
+
+
+class FrontierItem(NamedTuple):
+    id: int
+    url: str
+    kind: str
+    attempts: int
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class CrawlFrontier:
+    """SQLite-backed URL queue with pending/in_flight/done/failed states.
+
+    Claims are a single UPDATE ... RETURNING, so several processes can
+    share one frontier without fetching the same URL twice. Failed URLs go
+    back to pending with exponential backoff until `max_attempts`. A claim
+    is a lease: workers renew it with heartbeat(), and claims not renewed
+    within `lease_seconds` are handed back out as abandoned by a dead worker.
+    The same code runs against PostgreSQL for workers on several hosts.
+    """
+
+    def __init__(self, db_engine=None, worker_id: str = None,
+                 max_attempts: int = FRONTIER_CONFIG['max_attempts'],
+                 backoff_seconds: float = FRONTIER_CONFIG['backoff_seconds'],
+                 lease_seconds: float = FRONTIER_CONFIG['lease_seconds']):
+        self.engine = db_engine or get_engine()
+        self.worker_id = worker_id or default_worker_id()
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.table = FrontierURL.__table__
+        self.table.create(self.engine, checkfirst=True)
+
+    def add(self, urls: Iterable[str], kind: str, priority: int = None) -> int:
+        """Enqueue URLs that are not in the frontier yet."""
+        now = datetime.utcnow()
+        priority = PRIORITIES.get(kind, 0) if priority is None else priority
+        rows = [{'url': url, 'kind': kind, 'state': PENDING, 'priority': priority,
+                 'attempts': 0, 'next_attempt_at': now, 'updated_at': now}
+                for url in dict.fromkeys(urls)]
+        if not rows:
+            return 0
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                insert(self.table).on_conflict_do_nothing(index_elements=['url']), rows)
+        return result.rowcount
+
+    def claim(self, limit: int = FRONTIER_CONFIG['claim_batch'],
+              kinds: Optional[Sequence[str]] = None) -> List[FrontierItem]:
+        """Atomically move up to `limit` due URLs to in_flight for this worker."""
+        now = datetime.utcnow()
+        t = self.table
+        due = select(t.c.id).where(t.c.state == PENDING, t.c.next_attempt_at <= now)
+        if kinds:
+            due = due.where(t.c.kind.in_(kinds))
+        due = due.order_by(t.c.priority.desc(), t.c.id).limit(limit)
+        # Re-checking the state keeps concurrent claims disjoint on PostgreSQL too
+        stmt = update(t).where(t.c.id.in_(due.scalar_subquery()), t.c.state == PENDING).values(
+            state=IN_FLIGHT, claimed_by=self.worker_id, claimed_at=now,
+            attempts=t.c.attempts + 1, updated_at=now,
+        ).returning(t.c.id, t.c.url, t.c.kind, t.c.attempts)
+        with self.engine.begin() as conn:
+            return [FrontierItem(*row) for row in conn.execute(stmt)]
+
+    def complete(self, items: Iterable[FrontierItem]):
+        ids = [item.id for item in items]
+        if not ids:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(update(self.table).where(self.table.c.id.in_(ids)).values(
+                state=DONE, claimed_by=None, updated_at=datetime.utcnow()))
+
+    def fail(self, item: FrontierItem, error: str):
+        """Schedule a retry with jittered exponential backoff, or give up."""
+        now = datetime.utcnow()
+        if item.attempts >= self.max_attempts:
+            values = {'state': FAILED}
+            logger.error(f"Giving up on {item.url} after {item.attempts} attempts: {error}")
+        else:
+            delay = self.backoff_seconds * 2 ** (item.attempts - 1)
+            delay *= random.uniform(0.5, 1.5)
+            values = {'state': PENDING, 'next_attempt_at': now + timedelta(seconds=delay)}
+        with self.engine.begin() as conn:
+            conn.execute(update(self.table).where(self.table.c.id == item.id).values(
+                last_error=error[:500], claimed_by=None, updated_at=now, **values))
+
+    def heartbeat(self) -> int:
+        """Renew the lease on every URL this worker holds."""
+        t = self.table
+        with self.engine.begin() as conn:
+            return conn.execute(update(t).where(
+                t.c.state == IN_FLIGHT, t.c.claimed_by == self.worker_id,
+            ).values(claimed_at=datetime.utcnow())).rowcount
+
+    def start_heartbeat(self, interval: float = None) -> threading.Event:
+        """Renew leases on a daemon thread until the returned event is set."""
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    logger.error(f"Frontier heartbeat failed: {e}")
+
+        threading.Thread(target=beat, daemon=True).start()
+        return stop
+
+    def reclaim_stale(self) -> int:
+        """Return URLs whose claim outlived the lease to pending."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        t = self.table
+        with self.engine.begin() as conn:
+            result = conn.execute(update(t).where(
+                t.c.state == IN_FLIGHT, t.c.claimed_at < cutoff,
+            ).values(state=PENDING, claimed_by=None, updated_at=datetime.utcnow()))
+        if result.rowcount:
+            logger.info(f"Reclaimed {result.rowcount} stale frontier URLs")
+        return result.rowcount
+
+    def retry_failed(self) -> int:
+        """Give URLs that exhausted their attempts another round."""
+        t = self.table
+        with self.engine.begin() as conn:
+            return conn.execute(update(t).where(t.c.state == FAILED).values(
+                state=PENDING, attempts=0, next_attempt_at=datetime.utcnow())).rowcount
+
+    def counts(self, kinds: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        t = self.table
+        query = select(t.c.state, func.count()).group_by(t.c.state)
+        if kinds:
+            query = query.where(t.c.kind.in_(kinds))
+        with self.engine.connect() as conn:
+            return {state: count for state, count in conn.execute(query)}
+
+    def has_work(self, kinds: Optional[Sequence[str]] = None) -> bool:
+        """True while any URL is pending (possibly backing off) or in flight."""
+        counts = self.counts(kinds)
+        return bool(counts.get(PENDING) or counts.get(IN_FLIGHT))
+
+    def reset(self):
+        """Forget all URLs, for a fresh crawl."""
+        with self.engine.begin() as conn:
+            conn.execute(self.table.delete())
+
+
+def main():
+    import argparse
+    from scraper import BookScraper
+
+    parser = argparse.ArgumentParser(description="Crawl through the persistent frontier")
+    parser.add_argument('--fresh', action='store_true',
+                        help='Discard the saved frontier and start a new crawl')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Retry URLs that exhausted their attempts')
+    args = parser.parse_args()
+
+    frontier = CrawlFrontier()
+    if args.fresh:
+        frontier.reset()
+    if args.retry_failed:
+        frontier.retry_failed()
+    BookScraper().scrape_frontier(frontier)
+    logger.info(f"Frontier: {frontier.counts()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,20 @@
+import logging
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
-from models import SessionLocal, Book
-import pandas as pd
-from tabulate import tabulate
+from models import SessionLocal
+from query_cache import cached_book_page, cached_categories, cached_stats, query_cache
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per keyset page, and the most rows kept in the Treeview at once
+PAGE_SIZE = 200
+MAX_LOADED_ROWS = 5 * PAGE_SIZE
+# How often the Tk main loop picks up results from the query thread (ms)
+POLL_INTERVAL_MS = 30
+# Fetch another page when the visible window is this close to either end
+SCROLL_THRESHOLD = 0.1
 
 
 class BookViewerGUI:
@@ -61,14 +73,14 @@ class BookViewerGUI:
         self.tree.column("In Stock", width=100)
         self.tree.column("Availability", width=100)
 
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(
+        # Add scrollbar; scrolling near either end loads another page
+        self.scrollbar = ttk.Scrollbar(
             self.main_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
 
         # Grid layout
         self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
 
         # Stats frame
         self.stats_frame = ttk.LabelFrame(
@@ -89,6 +101,29 @@ class BookViewerGUI:
             self.stats_frame, text="Categories: 0")
         self.categories_label.grid(row=0, column=2, padx=10)
 
+        self.cache_label = ttk.Label(
+            self.stats_frame, text="Cache Hits: 0%")
+        self.cache_label.grid(row=0, column=3, padx=10)
+
+        # Status bar, for queries that failed
+        self.status_var = tk.StringVar()
+        self.status_label = ttk.Label(self.main_frame, textvariable=self.status_var)
+        self.status_label.grid(row=3, column=0, columnspan=2, sticky=tk.W)
+
+        # Database queries run on a background thread; results come back
+        # to the Tk main loop through a queue polled with after()
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        threading.Thread(target=self.query_worker, daemon=True).start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
+
+        # Paging state for the current filter
+        self.generation = 0
+        self.filters = (None, None)
+        self.loading = False
+        self.more_below = False
+        self.more_above = False
+
         # Load initial data
         self.load_books()
         self.update_stats()
@@ -97,44 +132,131 @@ class BookViewerGUI:
         """Get list of categories from database."""
         db = SessionLocal()
         try:
-            categories = db.query(Book.category).distinct().all()
-            return [cat[0] for cat in categories]
+            return cached_categories(db)
         finally:
             db.close()
 
-    def load_books(self, search_term=None, category=None):
-        """Load books from database into treeview."""
-        db = SessionLocal()
+    def query_worker(self):
+        """Run queued database jobs off the Tk main thread."""
+        while True:
+            query, on_done, on_error = self.jobs.get()
+            db = SessionLocal()
+            try:
+                result = query(db)
+            except Exception as e:
+                logger.exception("Background query failed")
+                result = e
+            finally:
+                db.close()
+            self.results.put((on_done, on_error, result))
+
+    def run_in_background(self, query, on_done, on_error=None):
+        """Run `query(db)` on the worker thread, then `on_done(result)` on the main thread.
+
+        If the query raises, the error is shown in the status bar and passed
+        to `on_error`.
+        """
+        self.jobs.put((query, on_done, on_error))
+
+    def poll_results(self):
+        """Apply finished query results to the widgets."""
         try:
-            # Clear existing items
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            # Build query
-            query = db.query(Book)
-            if search_term:
-                query = query.filter(Book.title.ilike(f"%{search_term}%"))
-            if category and category != "All Categories":
-                query = query.filter(Book.category == category)
-
-            # Get books
-            books = query.all()
-
-            # Insert into treeview
-            for book in books:
-                self.tree.insert("", tk.END, values=(
-                    book.title,
-                    f"£{book.price:.2f}",
-                    book.category,
-                    book.rating,
-                    "Yes" if book.in_stock else "No",
-                    book.availability
-                ))
-        finally:
-            db.close()
+            while True:
+                on_done, on_error, result = self.results.get_nowait()
+                if isinstance(result, Exception):
+                    # SQLAlchemy errors go on to quote the SQL; the first line says enough
+                    message = str(result).splitlines()[0] if str(result) else ''
+                    self.status_var.set(f"Query failed: {type(result).__name__}: {message}")
+                    if on_error:
+                        on_error(result)
+                else:
+                    on_done(result)
+        except queue.Empty:
+            pass
+        self.root.after(POLL_INTERVAL_MS, self.poll_results)
+
+    def fetch_page(self, db, search_term, category, after_id=None, before_id=None):
+        """Fetch one keyset page of (id, title, price, ...) rows ordered by id."""
+        if category == "All Categories":
+            category = None
+        return cached_book_page(db, search_term, category, after_id, before_id, PAGE_SIZE)
+
+    def load_books(self, search_term=None, category=None):
+        """Reset the treeview and load the first page for the given filter."""
+        self.generation += 1
+        self.filters = (search_term, category)
+        self.status_var.set("")
+        self.tree.delete(*self.tree.get_children())
+        self.more_above = False
+        self.more_below = True
+        self.request_page(below=True)
+
+    def request_page(self, below: bool):
+        """Ask the worker for the page after the last (or before the first) loaded row."""
+        self.loading = True
+        generation = self.generation
+        search_term, category = self.filters
+        items = self.tree.get_children()
+        if below:
+            keyset = {'after_id': int(items[-1]) if items else None}
+        else:
+            keyset = {'before_id': int(items[0])}
+        self.run_in_background(
+            lambda db: self.fetch_page(db, search_term, category, **keyset),
+            lambda rows: self.show_page(generation, rows, below),
+            lambda error: self.page_failed(generation))
+
+    def show_page(self, generation, rows, below: bool):
+        """Insert a fetched page, trimming the far end to keep the window bounded."""
+        if generation != self.generation:
+            return  # The filter changed while this page was loading
+        self.loading = False
+        anchor = self.tree.identify_row(0)
+        for row in (rows if below else reversed(rows)):
+            self.tree.insert("", tk.END if below else 0, iid=str(row.id), values=(
+                row.title,
+                f"£{row.price:.2f}",
+                row.category,
+                row.rating,
+                "Yes" if row.in_stock else "No",
+                row.availability
+            ))
+        if below:
+            self.more_below = len(rows) == PAGE_SIZE
+        else:
+            self.more_above = len(rows) == PAGE_SIZE
+
+        items = self.tree.get_children()
+        excess = len(items) - MAX_LOADED_ROWS
+        if excess > 0:
+            if below:
+                self.tree.delete(*items[:excess])
+                self.more_above = True
+            else:
+                self.tree.delete(*items[-excess:])
+                self.more_below = True
+        # Keep the row that was at the top of the view in place
+        if anchor and self.tree.exists(anchor):
+            items = self.tree.get_children()
+            self.tree.yview_moveto(self.tree.index(anchor) / len(items))
+
+    def page_failed(self, generation):
+        if generation == self.generation:
+            # Let the next scroll retry instead of staying stuck
+            self.loading = False
+
+    def on_tree_scroll(self, first, last):
+        """Scrollbar callback that loads more rows near either end."""
+        self.scrollbar.set(first, last)
+        if self.loading:
+            return
+        if float(last) > 1 - SCROLL_THRESHOLD and self.more_below:
+            self.request_page(below=True)
+        elif float(first) < SCROLL_THRESHOLD and self.more_above:
+            self.request_page(below=False)
 
     def search_books(self):
-        """Search books by title."""
+        """Search books by title and description."""
         search_term = self.search_var.get()
         category = self.category_var.get()
         self.load_books(search_term, category)
@@ -149,23 +271,24 @@ class BookViewerGUI:
 
     def update_stats(self):
         """Update statistics display."""
-        db = SessionLocal()
-        try:
-            total_books = db.query(Book).count()
-            avg_price = db.query(Book.price).all()
-            avg_price = sum(price[0] for price in avg_price) / \
-                len(avg_price) if avg_price else 0
-            categories = db.query(Book.category).distinct().count()
-
-            self.total_books_label.config(text=f"Total Books: {total_books}")
-            self.avg_price_label.config(
-                text=f"Average Price: £{avg_price:.2f}")
-            self.categories_label.config(text=f"Categories: {categories}")
-        finally:
-            db.close()
+        self.run_in_background(cached_stats, self.show_stats)
 
+    def show_stats(self, stats):
+        self.total_books_label.config(
+            text=f"Total Books: {stats['total_books']}")
+        self.avg_price_label.config(
+            text=f"Average Price: £{stats['avg_price']:.2f}")
+        self.categories_label.config(
+            text=f"Categories: {stats['categories']}")
+        self.cache_label.config(
+            text=f"Cache Hits: {query_cache.stats()['hit_rate']:.0%}")
 
-if __name__ == "__main__":
+
+def main():
     root = tk.Tk()
-    app = BookViewerGUI(root)
+    BookViewerGUI(root)
     root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
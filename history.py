@@ -0,0 +1,231 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+
+from models import BookHistory, Crawl, HistoryUPC
+from records import BookRecord, to_pence
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TABLES = [Crawl.__table__, HistoryUPC.__table__, BookHistory.__table__]
+# Tracked fields, as stored in book_history
+HISTORY_FIELDS = ('price_pence', 'availability', 'in_stock')
+
+
+def history_fields(book) -> Dict:
+    """The tracked fields of a scraped BookRecord or a listing update dict.
+
+    Listing updates carry no availability count; a book that went out of
+    stock has an availability of 0, as in update_listing_fields.
+    """
+    if isinstance(book, BookRecord):
+        return {'price_pence': book.price_pence, 'availability': book.availability,
+                'in_stock': book.in_stock}
+    fields = {}
+    if book.get('price') is not None:
+        fields['price_pence'] = to_pence(book['price'])
+    if book.get('availability') is not None:
+        fields['availability'] = book['availability']
+    elif book.get('in_stock') is False:
+        fields['availability'] = 0
+    if book.get('in_stock') is not None:
+        fields['in_stock'] = bool(book['in_stock'])
+    return fields
+
+
+def readable(fields: Dict) -> Dict:
+    """Turn stored fields into book fields, with prices back in pounds."""
+    fields = dict(fields)
+    if 'price_pence' in fields:
+        fields['price'] = fields.pop('price_pence') / 100
+    return fields
+
+
+def upsert_history_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT that merges a second change in the same crawl."""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"History is not supported for {dialect_name}")
+
+    table = BookHistory.__table__
+    stmt = dialect_insert(table)
+    set_ = {field: func.coalesce(stmt.excluded[field], table.c[field])
+            for field in HISTORY_FIELDS}
+    return stmt.on_conflict_do_update(index_elements=['upc_id', 'crawl_id'], set_=set_)
+
+
+def fold_state(db, crawl_id: Optional[int] = None) -> Dict[int, Dict]:
+    """Each UPC id's latest value of every field, up to and including `crawl_id`.
+
+    Rows are read in primary key order, so this is one pass over the table.
+    """
+    table = BookHistory.__table__
+    query = select(table.c.upc_id, *(table.c[field] for field in HISTORY_FIELDS)) \
+        .order_by(table.c.upc_id, table.c.crawl_id)
+    if crawl_id is not None:
+        query = query.where(table.c.crawl_id <= crawl_id)
+    state: Dict[int, Dict] = {}
+    for upc_id, *values in db.execute(query):
+        current = state.setdefault(upc_id, {})
+        for field, value in zip(HISTORY_FIELDS, values):
+            if value is not None:
+                current[field] = value
+    return state
+
+
+def upc_names(db) -> Dict[int, str]:
+    return dict(db.execute(select(HistoryUPC.id, HistoryUPC.upc)).all())
+
+
+def latest_crawl_id(db) -> Optional[int]:
+    return db.execute(select(func.max(Crawl.id))).scalar()
+
+
+def list_crawls(db) -> List[Tuple[int, datetime, Optional[datetime]]]:
+    """(id, started_at, finished_at) of every recorded crawl, oldest first."""
+    return db.execute(select(Crawl.id, Crawl.started_at, Crawl.finished_at)
+                      .order_by(Crawl.id)).all()
+
+
+def price_series(db, upc: str) -> List[Tuple[int, datetime, float]]:
+    """(crawl id, crawl start, price) for every crawl that saw a new price."""
+    rows = db.execute(
+        select(BookHistory.crawl_id, Crawl.started_at, BookHistory.price_pence)
+        .join(HistoryUPC, HistoryUPC.id == BookHistory.upc_id)
+        .join(Crawl, Crawl.id == BookHistory.crawl_id)
+        .where(HistoryUPC.upc == upc, BookHistory.price_pence.is_not(None))
+        .order_by(BookHistory.crawl_id))
+    return [(crawl_id, started_at, pence / 100) for crawl_id, started_at, pence in rows]
+
+
+def changes_since(db, crawl_id: int) -> List[Dict]:
+    """Every change recorded after `crawl_id`: upc, crawl_id and the changed fields."""
+    table = BookHistory.__table__
+    rows = db.execute(
+        select(HistoryUPC.upc, table.c.crawl_id, *(table.c[field] for field in HISTORY_FIELDS))
+        .join(HistoryUPC, HistoryUPC.id == table.c.upc_id)
+        .where(table.c.crawl_id > crawl_id)
+        .order_by(table.c.crawl_id, table.c.upc_id))
+    changes = []
+    for upc, change_crawl, *values in rows:
+        fields = {field: value for field, value in zip(HISTORY_FIELDS, values)
+                  if value is not None}
+        changes.append({'upc': upc, 'crawl_id': change_crawl, **readable(fields)})
+    return changes
+
+
+def catalogue_at(db, crawl_id: Optional[int] = None) -> Dict[str, Dict]:
+    """Price, availability and stock of every book as of `crawl_id` (default: latest)."""
+    names = upc_names(db)
+    return {names[upc_id]: readable(fields) for upc_id, fields in fold_state(db, crawl_id).items()}
+
+
+def create_history_tables(bind):
+    for table in HISTORY_TABLES:
+        table.create(bind, checkfirst=True)
+
+
+def open_crawl(db) -> int:
+    """Create the history tables if needed and start a crawl; returns its id."""
+    create_history_tables(db.get_bind())
+    crawl = Crawl(started_at=datetime.utcnow())
+    db.add(crawl)
+    db.commit()
+    return crawl.id
+
+
+def close_crawl(db, crawl_id: int):
+    """Mark a crawl finished."""
+    db.query(Crawl).filter(Crawl.id == crawl_id) \
+        .update({Crawl.finished_at: datetime.utcnow()})
+    db.commit()
+
+
+class HistoryRecorder:
+    """Append a crawl's price and availability changes to book_history.
+
+    A crawl row is created up front and every book's latest state is rebuilt
+    from the history once, so `record` only writes fields that differ. New
+    state is kept aside until the caller's transaction commits: call
+    `commit` after it does and `rollback` if it was rolled back.
+
+    Processes sharing one crawl (distributed workers) pass the `crawl_id`
+    their coordinator opened; whoever opened it also closes it.
+    """
+
+    def __init__(self, db, crawl_id: Optional[int] = None):
+        self.owns_crawl = crawl_id is None
+        if self.owns_crawl:
+            crawl_id = open_crawl(db)
+        else:
+            create_history_tables(db.get_bind())
+        self.crawl_id = crawl_id
+        names = upc_names(db)
+        self.known: Dict[str, Tuple[int, Dict]] = {
+            names[upc_id]: (upc_id, fields) for upc_id, fields in fold_state(db).items()}
+        self.statement = upsert_history_statement(db.get_bind().dialect.name)
+        self.pending: Dict[str, Tuple[int, Dict]] = {}
+        self.changes = 0
+        self.pending_changes = 0
+
+    def record(self, db, books: Iterable) -> int:
+        """Write the changed fields of records or listing updates; returns the rows written."""
+        changed: Dict[str, Dict] = {}
+        for book in books:
+            upc = book.upc if isinstance(book, BookRecord) else book.get('upc')
+            if not upc:
+                continue
+            _, state = self.pending.get(upc) or self.known.get(upc, (None, {}))
+            state = {**state, **changed.get(upc, {})}
+            delta = {field: value for field, value in history_fields(book).items()
+                     if state.get(field) != value}
+            if delta:
+                changed.setdefault(upc, {}).update(delta)
+        if not changed:
+            return 0
+        self.assign_ids(db, [upc for upc in changed if upc not in self.known
+                             and upc not in self.pending])
+        rows = []
+        for upc, delta in changed.items():
+            upc_id, state = self.pending.get(upc) or self.known[upc]
+            self.pending[upc] = (upc_id, {**state, **delta})
+            rows.append({'upc_id': upc_id, 'crawl_id': self.crawl_id,
+                         **{field: delta.get(field) for field in HISTORY_FIELDS}})
+        db.execute(self.statement, rows)
+        self.pending_changes += len(rows)
+        return len(rows)
+
+    def assign_ids(self, db, upcs: List[str]):
+        """Add new UPCs to the dictionary and note their ids as pending."""
+        if not upcs:
+            return
+        db.execute(insert(HistoryUPC), [{'upc': upc} for upc in upcs])
+        for upc_id, upc in db.execute(select(HistoryUPC.id, HistoryUPC.upc)
+                                      .where(HistoryUPC.upc.in_(upcs))):
+            self.pending[upc] = (upc_id, {})
+
+    def commit(self):
+        """Adopt the recorded state once the caller's transaction has committed."""
+        self.known.update(self.pending)
+        self.pending.clear()
+        self.changes += self.pending_changes
+        self.pending_changes = 0
+
+    def rollback(self):
+        self.pending.clear()
+        self.pending_changes = 0
+
+    def finish(self, db) -> int:
+        """Mark the crawl finished if this recorder opened it.
+
+        Returns the number of history rows this recorder wrote.
+        """
+        if self.owns_crawl:
+            close_crawl(db, self.crawl_id)
+        logger.info(f"Price history: crawl {self.crawl_id} recorded {self.changes} changes")
+        return self.changes
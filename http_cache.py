@@ -0,0 +1,208 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import HTTP_CACHE_CONFIG
+from transport import TunedAdapter
+
+
+class CachedResponse:
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('ETag') or self.headers.get('etag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('Last-Modified') or self.headers.get('last-modified')
+
+
+class ResponseCache:
+    """Size-bounded, SQLite-backed store of GET responses with LRU eviction."""
+
+    def __init__(self, path: str = HTTP_CACHE_CONFIG['path'],
+                 max_bytes: int = HTTP_CACHE_CONFIG['max_bytes']):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_last_access ON responses (last_access)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+        return CachedResponse(url, row[0], json.loads(row[1]), row[2])
+
+    def record_hit(self):
+        """Count a response served from the cache, as a 304 or offline replay."""
+        with self.lock:
+            self.hits += 1
+
+    def record_miss(self):
+        """Count a cached URL whose revalidation returned new content."""
+        with self.lock:
+            self.misses += 1
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self.lock:
+            old = self.conn.execute(
+                "SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(dict(headers)), body, size, now, now))
+            self.total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self.conn.commit()
+
+    def refresh(self, url: str, headers: Dict[str, str]):
+        """Merge the validators from a 304 response into the stored entry."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT headers FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return
+            merged = json.loads(row[0])
+            for name in ('ETag', 'Last-Modified', 'Date', 'Cache-Control', 'Expires'):
+                if name in headers:
+                    merged[name] = headers[name]
+            self.conn.execute(
+                "UPDATE responses SET headers = ?, stored_at = ? WHERE url = ?",
+                (json.dumps(merged), time.time(), url))
+            self.conn.commit()
+            self.revalidated += 1
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            row = self.conn.execute(
+                "SELECT url, size FROM responses ORDER BY last_access LIMIT 1").fetchone()
+            if row is None:
+                self.total_bytes = 0
+                return
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (row[0],))
+            self.total_bytes -= row[1]
+
+    def conditional_headers(self, cached: Optional[CachedResponse]) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified."""
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+        return headers
+
+    def stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size_bytes': self.total_bytes,
+            }
+
+    def close(self):
+        self.conn.close()
+
+
+class CachingAdapter(TunedAdapter):
+    """Transport adapter that revalidates GETs against a ResponseCache.
+
+    With `offline=True` no network request is made: cached responses are
+    replayed and misses raise requests.ConnectionError.
+    """
+
+    def __init__(self, cache: ResponseCache, offline: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.offline = offline
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        cached = self.cache.get(request.url)
+        if self.offline:
+            if cached is None:
+                raise requests.ConnectionError(
+                    f"Offline replay: {request.url} is not cached", request=request)
+            self.cache.record_hit()
+            return self.build_cached_response(request, cached)
+
+        request.headers.update(self.cache.conditional_headers(cached))
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(request.url, response.headers)
+            self.cache.record_hit()
+            response.close()
+            return self.build_cached_response(request, cached)
+        if response.status_code == 200:
+            if cached is not None:
+                self.cache.record_miss()
+            self.cache.put(request.url, response.status_code,
+                           response.headers, response.content)
+        return response
+
+    def build_cached_response(self, request, cached: CachedResponse) -> requests.Response:
+        response = requests.Response()
+        response.status_code = cached.status
+        response.headers = CaseInsensitiveDict(cached.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = cached.body
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK'
+        response.from_cache = True
+        return response
+
+
+def install_cache(session: requests.Session, cache: Optional[ResponseCache] = None,
+                  offline: bool = HTTP_CACHE_CONFIG['offline']) -> ResponseCache:
+    """Mount a CachingAdapter on `session` for http and https URLs."""
+    cache = cache or ResponseCache()
+    adapter = CachingAdapter(cache, offline=offline)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return cache
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from models import PageFingerprint
+from records import BookRecord
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha1(html.encode('utf-8')).hexdigest()
+
+
+def fields_hash(book: BookRecord) -> str:
+    # Hashed in the book's column form, so fingerprints of earlier crawls still match
+    book = book.as_dict()
+    return hashlib.sha1(json.dumps(book, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class CrawlReport:
+    def __init__(self):
+        self.new = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'new': self.new, 'changed': self.changed,
+                'unchanged': self.unchanged, 'removed': self.removed}
+
+    def __str__(self):
+        return ', '.join(f"{key}={value}" for key, value in self.as_dict().items())
+
+
+class IncrementalTracker:
+    """Decide which product pages need parsing and which books need writing.
+
+    Fingerprints from the previous crawl are loaded up front. A page whose
+    raw HTML hashes the same as last time is skipped before parsing; a page
+    that did change is only emitted if its parsed fields differ as well.
+    The fingerprint of an emitted book is only written with the batch that
+    stores the book: call `flush` with the batch, then `commit` once the
+    caller's transaction has committed or `rollback` if it was rolled back.
+    """
+
+    def __init__(self, db):
+        self.known: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {
+            row.url: (row.content_hash, row.upc, row.fields_hash)
+            for row in db.query(PageFingerprint)
+        }
+        self.seen: Set[str] = set()
+        # Fingerprints of pages whose book needs no write
+        self.pending: Dict[str, PageFingerprint] = {}
+        # Per UPC of an emitted book: its new fingerprint and the one it replaced
+        self.unsaved: Dict[str, Tuple[PageFingerprint, Optional[Tuple]]] = {}
+        self.complete = True
+        self.report = CrawlReport()
+
+    def is_unchanged_page(self, url: str, html: str) -> bool:
+        """Mark `url` as seen and report whether its HTML is byte-identical."""
+        if self.page_matches(url, html):
+            self.mark_unchanged(url)
+            return True
+        self.seen.add(url)
+        return False
+
+    def page_matches(self, url: str, html: str) -> bool:
+        """Whether the HTML is byte-identical to last crawl's.
+
+        Only reads the tracker, so another thread may call it while the
+        owning thread records and flushes.
+        """
+        known = self.known.get(url)
+        return known is not None and known[0] == content_hash(html)
+
+    def mark_unchanged(self, url: str):
+        """Count a page whose HTML matched as seen and unchanged."""
+        content, upc, digest = self.known[url]
+        self.seen.add(url)
+        # Still refresh last_seen, which records when the page was last fetched
+        self.pending[url] = PageFingerprint(url=url, content_hash=content, upc=upc,
+                                            fields_hash=digest, last_seen=datetime.utcnow())
+        self.report.unchanged += 1
+
+    def mark_seen(self, url: str):
+        """Count a page as still listed without fetching it.
+
+        Also used for pages whose fetch failed: their old fingerprint is kept,
+        so they are neither removed now nor taken for new books next time.
+        """
+        self.seen.add(url)
+
+    def mark_incomplete(self):
+        """Note that some listing pages failed, so not every book was enumerated.
+
+        A plain flag, so the thread enumerating URLs may set it.
+        """
+        self.complete = False
+
+    def record(self, url: str, html: str, book: BookRecord) -> bool:
+        """Note the page's new fingerprint; return True if the book changed."""
+        digest = fields_hash(book)
+        known = self.known.get(url)
+        fingerprint = PageFingerprint(
+            url=url, content_hash=content_hash(html), upc=book.upc, fields_hash=digest,
+            last_seen=datetime.utcnow())
+        self.known[url] = (fingerprint.content_hash, book.upc, digest)
+        if known is None or known[2] != digest:
+            self.unsaved[book.upc] = (fingerprint, known)
+            return True
+        self.pending[url] = fingerprint
+        self.report.unchanged += 1
+        return False
+
+    def flush(self, db, books: Iterable[BookRecord] = ()):
+        """Add pending fingerprints and those of `books` to `db`; the caller commits."""
+        for fingerprint in self.pending.values():
+            db.merge(fingerprint)
+        for book in books:
+            if book.upc in self.unsaved:
+                db.merge(self.unsaved[book.upc][0])
+
+    def commit(self, books: Iterable[BookRecord] = ()):
+        """Count `books` as written once the caller's transaction has committed."""
+        self.pending.clear()
+        for book in books:
+            entry = self.unsaved.pop(book.upc, None)
+            if entry is None:
+                continue
+            if entry[1] is None:
+                self.report.new += 1
+            else:
+                self.report.changed += 1
+
+    def rollback(self, books: Iterable[BookRecord]):
+        """Forget the fingerprints of `books`, whose write was rolled back.
+
+        Their previous fingerprints are restored, so the next crawl writes
+        them again. Pending fingerprints stay queued for the next batch.
+        """
+        for book in books:
+            entry = self.unsaved.pop(book.upc, None)
+            if entry is None:
+                continue
+            fingerprint, previous = entry
+            if previous is None:
+                self.known.pop(fingerprint.url, None)
+            else:
+                self.known[fingerprint.url] = previous
+
+    def finish(self, db, complete: bool = True) -> CrawlReport:
+        """Persist remaining fingerprints and drop pages no longer listed.
+
+        Pages are only dropped after a full crawl that enumerated every
+        listing page; pass `complete=False` for a crawl that was cut short,
+        otherwise the books it did not reach are counted as removed.
+        """
+        self.flush(db)
+        if self.unsaved:
+            logger.warning(f"{len(self.unsaved)} changed books were never written")
+        complete = complete and self.complete
+        if not complete:
+            logger.warning("Crawl did not enumerate every book; skipping removals")
+        removed = [url for url in self.known if url not in self.seen] if complete else []
+        for url in removed:
+            db.query(PageFingerprint).filter(PageFingerprint.url == url).delete()
+            logger.info(f"Book removed from catalogue: {url}")
+        self.report.removed = len(removed)
+        db.commit()
+        self.commit()
+        return self.report
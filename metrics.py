@@ -0,0 +1,271 @@
+import bisect
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from config import METRICS_CONFIG, PROFILE_PATH, TRACE_MEMORY
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PREFIX = 'scraper'
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': round(self.max, 6),
+        }
+
+
+class CrawlMetrics:
+    """Counters, error counts and per-stage timings for one crawl process.
+
+    Stages are 'fetch', 'parse', 'csv_write' and 'db_batch'. Counters
+    include pages_fetched, bytes_fetched, cache_hits/cache_misses and
+    books_saved; errors are counted by exception type or HTTP status.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters: Dict[str, float] = {}
+        self.errors: Dict[str, int] = {}
+        self.stages: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def error(self, kind: str):
+        with self.lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            elapsed = time.time() - self.started_at
+            counters = dict(self.counters)
+            lookups = counters.get('cache_hits', 0) + counters.get('cache_misses', 0)
+            return {
+                'timestamp': time.time(),
+                'elapsed_seconds': round(elapsed, 3),
+                'pages_per_second': round(counters.get('pages_fetched', 0) / elapsed, 3)
+                if elapsed else 0.0,
+                'cache_hit_rate': round(counters.get('cache_hits', 0) / lookups, 4)
+                if lookups else 0.0,
+                'counters': counters,
+                'errors': dict(self.errors),
+                'stages': {name: h.snapshot() for name, h in self.stages.items()},
+            }
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for name, value in sorted(snapshot['counters'].items()):
+            lines += [f"# TYPE {PREFIX}_{name}_total counter",
+                      f"{PREFIX}_{name}_total {value}"]
+        lines.append(f"# TYPE {PREFIX}_errors_total counter")
+        for kind, count in sorted(snapshot['errors'].items()):
+            lines.append(f'{PREFIX}_errors_total{{type="{kind}"}} {count}')
+        for name in ('pages_per_second', 'cache_hit_rate'):
+            lines += [f"# TYPE {PREFIX}_{name} gauge", f"{PREFIX}_{name} {snapshot[name]}"]
+        lines.append(f"# TYPE {PREFIX}_stage_seconds histogram")
+        with self.lock:
+            for stage, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_snapshot(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def start_snapshots(self, path: str, interval: float) -> threading.Event:
+        """Rewrite the JSON snapshot at `path` every `interval` seconds."""
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.write_snapshot(path)
+                except OSError as e:
+                    logger.error(f"Could not write metrics snapshot: {e}")
+
+        threading.Thread(target=loop, daemon=True).start()
+        return stop
+
+    def serve(self, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+        """Serve Prometheus text on http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+    def report(self):
+        """Log a summary and write the final snapshot, if one is configured."""
+        snapshot = self.snapshot()
+        stages = {name: (stage['count'], stage['sum']) for name, stage in snapshot['stages'].items()}
+        logger.info(f"Crawl metrics: {snapshot['pages_per_second']} pages/sec, "
+                    f"{int(snapshot['counters'].get('bytes_fetched', 0))} bytes, "
+                    f"cache hit rate {snapshot['cache_hit_rate']}, "
+                    f"errors {snapshot['errors']}, stage (count, seconds) {stages}")
+        if METRICS_CONFIG['snapshot_path']:
+            self.write_snapshot(METRICS_CONFIG['snapshot_path'])
+
+
+class NullMetrics:
+    """Stand-in used when metrics are disabled; every call is a no-op."""
+    enabled = False
+    _timer = contextlib.nullcontext()
+
+    def inc(self, name: str, value: float = 1):
+        pass
+
+    def error(self, kind: str):
+        pass
+
+    def observe(self, stage: str, seconds: float):
+        pass
+
+    def timer(self, stage: str):
+        return self._timer
+
+    def snapshot(self) -> Dict:
+        return {}
+
+    def report(self):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+_metrics: Optional[CrawlMetrics] = None
+
+
+def get_metrics(enabled: bool = METRICS_CONFIG['enabled']):
+    """The process-wide CrawlMetrics, started with the configured exporters."""
+    global _metrics
+    if not enabled:
+        return NULL_METRICS
+    if _metrics is None:
+        _metrics = CrawlMetrics()
+        if METRICS_CONFIG['port']:
+            _metrics.serve(METRICS_CONFIG['port'])
+        if METRICS_CONFIG['snapshot_path']:
+            _metrics.start_snapshots(METRICS_CONFIG['snapshot_path'],
+                                     METRICS_CONFIG['snapshot_seconds'])
+    return _metrics
+
+
+@contextlib.contextmanager
+def profile_run(path: str = PROFILE_PATH, trace_memory: bool = TRACE_MEMORY,
+                top: int = 15):
+    """Profile the enclosed block with cProfile and/or tracemalloc.
+
+    cProfile stats are dumped to `path` (load with pstats or snakeviz) and
+    the top cumulative functions are logged; with `trace_memory` the peak
+    and largest allocation sites are logged. Does nothing when neither is set.
+    """
+    profiler = cProfile.Profile() if path else None
+    if trace_memory:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        if trace_memory:
+            # Leave out the profiler's own bookkeeping
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            logger.info(f"Memory: current {current / 1024 ** 2:.1f} MiB, "
+                        f"peak {peak / 1024 ** 2:.1f} MiB")
+            for stat in snapshot.statistics('lineno')[:top]:
+                logger.info(f"  {stat}")
+        if profiler:
+            profiler.dump_stats(path)
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(top)
+            logger.info(f"Profile written to {path}; top functions by cumulative time:\n"
+                        f"{output.getvalue()}")
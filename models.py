@@ -1,15 +1,65 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import create_engine, event, Column, Index, Integer, String, Float, Boolean, DateTime
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from datetime import datetime
-from config import DB_CONFIG
+from config import DB_CONFIG, DB_MAX_OVERFLOW, DB_POOL_SIZE, SQLITE_PRAGMAS
 
 # Create database URL for SQLite
 DATABASE_URL = DB_CONFIG['sqlite_path']
 
-# Create engine and session
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def create_db_engine(url: str = DATABASE_URL, pragmas: dict = SQLITE_PRAGMAS):
+    """Create an engine, applying the SQLite storage profile to file databases.
+
+    Every pooled connection gets the pragmas on connect. With WAL, readers
+    (GUI, view_data.py) keep working while the scraper commits, and
+    busy_timeout makes concurrent writers wait instead of failing.
+    """
+    if not url.startswith('sqlite'):
+        return create_engine(url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+    in_memory = url in ('sqlite://', 'sqlite:///:memory:')
+    options = {} if in_memory else {'pool_size': DB_POOL_SIZE,
+                                    'max_overflow': DB_MAX_OVERFLOW}
+    db_engine = create_engine(url, connect_args={"check_same_thread": False}, **options)
+    if pragmas and not in_memory:
+        @event.listens_for(db_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    return db_engine
+
+
+_engine = None
+
+
+def get_engine():
+    """The process-wide engine, created on first use rather than at import."""
+    global _engine
+    if _engine is None:
+        _engine = create_db_engine()
+    return _engine
+
+
+def __getattr__(name: str):
+    # `from models import engine` keeps working, without creating it at import
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazySession(Session):
+    """A Session that binds to the process-wide engine when it first needs it."""
+
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            self.bind = get_engine()
+        return super().get_bind(*args, **kwargs)
+
+
+SessionLocal = sessionmaker(class_=LazySession, autocommit=False, autoflush=False)
 Base = declarative_base()
 
 
@@ -35,8 +85,105 @@ class Book(Base):
                         onupdate=datetime.utcnow)
 
 
+class DataVersion(Base):
+    """Single-row counter bumped by every commit that writes books.
+
+    Readers cache query results against it (see query_cache.py).
+    """
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PageFingerprint(Base):
+    """Per-URL content hash and per-UPC field hash used by incremental crawls."""
+    __tablename__ = "page_fingerprints"
+
+    url = Column(String, primary_key=True)
+    content_hash = Column(String)
+    upc = Column(String, index=True)
+    fields_hash = Column(String)
+    last_seen = Column(DateTime, default=datetime.utcnow,
+                       onupdate=datetime.utcnow)
+
+
+class CategoryStats(Base):
+    """Materialized per-category counts and price aggregates."""
+    __tablename__ = "category_stats"
+
+    category = Column(String, primary_key=True)
+    book_count = Column(Integer)
+    price_sum = Column(Float)
+    price_min = Column(Float)
+    price_max = Column(Float)
+    updated_at = Column(DateTime, default=datetime.utcnow,
+                        onupdate=datetime.utcnow)
+
+
+class FrontierURL(Base):
+    """A URL in the persistent crawl frontier."""
+    __tablename__ = "crawl_frontier"
+
+    id = Column(Integer, primary_key=True)
+    url = Column(String, unique=True, nullable=False)
+    kind = Column(String, nullable=False)  # home, listing or book
+    state = Column(String, default='pending', nullable=False)
+    priority = Column(Integer, default=0, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_by = Column(String)
+    claimed_at = Column(DateTime)
+    last_error = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow,
+                        onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_crawl_frontier_due', 'state', 'priority', 'next_attempt_at'),
+    )
+
+
+class Crawl(Base):
+    """One crawl run; its integer id is what history rows store."""
+    __tablename__ = "crawls"
+
+    id = Column(Integer, primary_key=True)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime)
+
+
+class HistoryUPC(Base):
+    """Dictionary of UPCs to the small integers history rows store."""
+    __tablename__ = "history_upcs"
+
+    id = Column(Integer, primary_key=True)
+    upc = Column(String, unique=True, nullable=False)
+
+
+class BookHistory(Base):
+    """Fields of a book that changed in a crawl; NULL means unchanged.
+
+    A book's first row holds every field. Prices are integer pence.
+    """
+    __tablename__ = "book_history"
+
+    upc_id = Column(Integer, primary_key=True)
+    crawl_id = Column(Integer, primary_key=True)
+    price_pence = Column(Integer)
+    availability = Column(Integer)
+    in_stock = Column(Boolean)
+
+    __table_args__ = (
+        Index('ix_book_history_crawl', 'crawl_id'),
+        {'sqlite_with_rowid': False},
+    )
+
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
+    from search import ensure_search_index
+    ensure_search_index(get_engine())
 
 
 def get_db():
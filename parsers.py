@@ -0,0 +1,159 @@
+import logging
+import re
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+
+from config import PARSER_BACKEND
+from records import BookRecord, book_record, to_pence
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; the BeautifulSoup backend always works
+    etree = None
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+PRICE_RE = re.compile(r'[^\d.]')
+NUMBER_RE = re.compile(r'\d+')
+
+
+def clean_price(price_str: str) -> float:
+    """Clean price string and convert to float."""
+    try:
+        # Remove any special characters and convert to float
+        return float(PRICE_RE.sub('', price_str))
+    except (ValueError, TypeError):
+        logger.error(f"Error cleaning price: {price_str}")
+        return 0.0
+
+
+def build_book(title: str, price_text: str, availability_text: str, rating: str,
+               category: str, description: str, product_info: Dict[str, str]) -> BookRecord:
+    """Assemble the book record shared by every parser backend."""
+    match = NUMBER_RE.search(availability_text)
+    availability = int(match.group()) if match else 0
+    return book_record(
+        title=title,
+        price_pence=to_pence(clean_price(price_text)),
+        availability=availability,
+        rating=rating,
+        category=category,
+        description=description,
+        upc=product_info.get('UPC', ''),
+        product_type=product_info.get('Product Type', ''),
+        price_excl_tax_pence=to_pence(clean_price(product_info.get('Price (excl. tax)', '0'))),
+        price_incl_tax_pence=to_pence(clean_price(product_info.get('Price (incl. tax)', '0'))),
+        tax_pence=to_pence(clean_price(product_info.get('Tax', '0'))),
+        num_reviews=int(product_info.get('Number of reviews', '0')),
+        in_stock=availability > 0
+    )
+
+
+class SoupBookParser:
+    """Reference backend: BeautifulSoup with the stdlib html.parser."""
+    name = 'soup'
+
+    def parse_book(self, html: str, book_url: str) -> Optional[BookRecord]:
+        return self.parse_soup(BeautifulSoup(html, 'html.parser'), book_url)
+
+    def parse_soup(self, soup: BeautifulSoup, book_url: str) -> Optional[BookRecord]:
+        try:
+            # Extract book information
+            product_info = {}
+            table = soup.find('table', class_='table-striped')
+            if table:
+                for row in table.find_all('tr'):
+                    header = row.find('th').text.strip()
+                    value = row.find('td').text.strip()
+                    product_info[header] = value
+
+            # Extract other details
+            description = soup.find('div', id='product_description')
+            return build_book(
+                title=soup.find('h1').text.strip(),
+                price_text=soup.find('p', class_='price_color').text.strip(),
+                availability_text=soup.find('p', class_='availability').text.strip(),
+                rating=soup.find('p', class_='star-rating')['class'][1],
+                category=soup.find('ul', class_='breadcrumb').find_all('li')[2].text.strip(),
+                description=description.find_next('p').text.strip() if description else '',
+                product_info=product_info,
+            )
+        except Exception as e:
+            logger.error(
+                f"Error parsing book details from {book_url}: {str(e)}")
+            return None
+
+
+def has_class(name: str) -> str:
+    """XPath predicate matching one token of the class attribute."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlBookParser:
+    """Fast backend: lxml with precompiled XPath selectors.
+
+    Selectors mirror the BeautifulSoup lookups (first match in document
+    order), so both backends return identical records.
+    """
+    name = 'lxml'
+
+    def __init__(self):
+        if lxml_html is None:
+            raise ImportError("The 'lxml' parser backend requires lxml")
+        self.table_rows = etree.XPath(
+            f"(//table[{has_class('table-striped')}])[1]//tr")
+        self.title = etree.XPath("(//h1)[1]")
+        self.price = etree.XPath(f"(//p[{has_class('price_color')}])[1]")
+        self.availability = etree.XPath(f"(//p[{has_class('availability')}])[1]")
+        self.rating = etree.XPath(f"(//p[{has_class('star-rating')}])[1]/@class")
+        self.description = etree.XPath(
+            "(//div[@id='product_description'][1]/descendant::p"
+            " | //div[@id='product_description'][1]/following::p)[1]")
+        self.has_description = etree.XPath("boolean(//div[@id='product_description'])")
+        self.breadcrumb = etree.XPath(f"(//ul[{has_class('breadcrumb')}])[1]//li")
+
+    def parse_book(self, html: str, book_url: str) -> Optional[BookRecord]:
+        try:
+            tree = lxml_html.fromstring(html)
+            product_info = {}
+            for row in self.table_rows(tree):
+                header = row.find('.//th')
+                value = row.find('.//td')
+                product_info[header.text_content().strip()] = value.text_content().strip()
+
+            description = ''
+            if self.has_description(tree):
+                description = self.description(tree)[0].text_content().strip()
+            return build_book(
+                title=self.title(tree)[0].text_content().strip(),
+                price_text=self.price(tree)[0].text_content().strip(),
+                availability_text=self.availability(tree)[0].text_content().strip(),
+                rating=self.rating(tree)[0].split()[1],
+                category=self.breadcrumb(tree)[2].text_content().strip(),
+                description=description,
+                product_info=product_info,
+            )
+        except Exception as e:
+            logger.error(
+                f"Error parsing book details from {book_url}: {str(e)}")
+            return None
+
+
+PARSERS = {
+    SoupBookParser.name: SoupBookParser,
+    LxmlBookParser.name: LxmlBookParser,
+}
+
+
+def get_parser(name: str = PARSER_BACKEND):
+    """Instantiate a parser backend, falling back to BeautifulSoup."""
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    try:
+        return PARSERS[name]()
+    except ImportError as e:
+        logger.warning(f"{e}; falling back to the BeautifulSoup parser")
+        return SoupBookParser()
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import bindparam, case, update
+from sqlalchemy.schema import CreateTable
+
+from config import UPSERT_BATCH_SIZE
+from models import Book, DataVersion
+from records import BookRecord
+
+# Columns overwritten when a book with the same UPC already exists
+UPDATE_COLUMNS = [
+    'title', 'price', 'availability', 'rating', 'category', 'description',
+    'product_type', 'price_excl_tax', 'price_incl_tax', 'tax', 'num_reviews', 'in_stock'
+]
+
+
+def upsert_statement(dialect_name: str):
+    """Build an INSERT ... ON CONFLICT (upc) DO UPDATE for the books table."""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported for {dialect_name}")
+
+    stmt = insert(Book.__table__)
+    set_ = {column: stmt.excluded[column] for column in UPDATE_COLUMNS}
+    set_['updated_at'] = datetime.utcnow()
+    return stmt.on_conflict_do_update(index_elements=['upc'], set_=set_)
+
+
+def upsert_books(db, books: List[BookRecord], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    """Upsert books keyed on UPC with one executemany per `batch_size` rows.
+
+    `db` may be a Session or a Connection; the caller owns the transaction
+    and commits once for all batches. Column values are bound per chunk, so
+    only `batch_size` parameter dicts exist at a time.
+    """
+    if not books:
+        return 0
+    bind = db if hasattr(db, 'dialect') else db.get_bind()
+    stmt = upsert_statement(bind.dialect.name)
+    for start in range(0, len(books), batch_size):
+        db.execute(stmt, [book.as_dict() for book in books[start:start + batch_size]])
+    return len(books)
+
+
+# Fields a category listing page shows, refreshed by shallow crawls
+LISTING_COLUMNS = ['title', 'price', 'rating', 'in_stock']
+
+
+def update_listing_fields(db, books: List[Dict], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    """Update listing fields of existing books, matched on UPC.
+
+    A book that went out of stock gets an availability of 0; the count of a
+    book in stock is only known from its detail page and is left alone.
+    The caller commits.
+    """
+    if not books:
+        return 0
+    table = Book.__table__
+    stmt = update(table).where(table.c.upc == bindparam('b_upc')).values(
+        **{column: bindparam(f'b_{column}') for column in LISTING_COLUMNS},
+        availability=case((bindparam('b_in_stock'), table.c.availability), else_=0),
+        updated_at=datetime.utcnow(),
+    )
+    rows = [{f'b_{key}': value for key, value in book.items()} for book in books]
+    for start in range(0, len(rows), batch_size):
+        db.execute(stmt, rows[start:start + batch_size])
+    return len(rows)
+
+
+def ensure_data_version(bind):
+    """Create the data_version table if missing, in its own transaction.
+
+    init_db creates it too; this covers databases made before it existed.
+    CREATE TABLE IF NOT EXISTS lets concurrent workers race harmlessly.
+    """
+    with bind.begin() as conn:
+        conn.execute(CreateTable(DataVersion.__table__, if_not_exists=True))
+
+
+def data_version_statement(dialect_name: str):
+    """One atomic INSERT ... ON CONFLICT (id) that adds 1 to the version row."""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Data versions are not supported for {dialect_name}")
+
+    table = DataVersion.__table__
+    stmt = insert(table).values(id=1, version=1, updated_at=datetime.utcnow())
+    return stmt.on_conflict_do_update(index_elements=['id'], set_={
+        'version': table.c.version + 1, 'updated_at': stmt.excluded.updated_at})
+
+
+def bump_data_version(db):
+    """Advance the data version cached readers compare against.
+
+    Call it in the transaction that writes books; the caller commits.
+    """
+    bind = db if hasattr(db, 'dialect') else db.get_bind()
+    db.execute(data_version_statement(bind.dialect.name))
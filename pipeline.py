@@ -0,0 +1,182 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from config import FETCH_WORKERS, PARSE_WORKERS, PARSER_BACKEND, PIPELINE_QUEUE_SIZE
+from models import SessionLocal
+from metrics import get_metrics, profile_run
+from parsers import get_parser
+from records import BookRecord
+from scraper import BATCH_SIZE, BookScraper
+from traversal import TraversalError, get_traversal
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue's input
+DONE = object()
+
+_worker_parsers = {}
+
+
+def parse_in_worker(book_url: str, html: str,
+                    backend: str) -> Tuple[Optional[BookRecord], float]:
+    """Parse one product page inside a pool process; returns the book and seconds taken."""
+    parser = _worker_parsers.get(backend)
+    if parser is None:
+        parser = _worker_parsers[backend] = get_parser(backend)
+    start = time.perf_counter()
+    book = parser.parse_book(html, book_url)
+    return book, time.perf_counter() - start
+
+
+class CrawlPipeline:
+    """Fetch -> parse -> persist pipeline with bounded queues between stages.
+
+    Fetching runs on `fetch_workers` threads, parsing on a pool of
+    `parse_workers` processes and persisting on the calling thread. Each
+    hand-off queue holds at most `queue_size` items, so a slow stage blocks
+    the stage before it instead of buffering unbounded HTML in memory.
+    """
+
+    def __init__(self, fetch: Callable[[str], Optional[str]],
+                 sink: Callable[[List[BookRecord]], None],
+                 parser_backend: str = PARSER_BACKEND,
+                 parse_workers: int = PARSE_WORKERS,
+                 fetch_workers: int = FETCH_WORKERS,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 batch_size: int = BATCH_SIZE,
+                 tracker=None,
+                 metrics=None):
+        self.fetch = fetch
+        self.sink = sink
+        self.parser_backend = parser_backend
+        self.parse_workers = parse_workers
+        self.fetch_workers = fetch_workers
+        self.batch_size = batch_size
+        self.tracker = tracker
+        self.metrics = metrics or get_metrics()
+        self.url_queue = queue.Queue(maxsize=queue_size)
+        self.html_queue = queue.Queue(maxsize=queue_size)
+        self.parsed_queue = queue.Queue(maxsize=queue_size)
+        self.pages = 0
+
+    def feed(self, book_urls: Iterable[str]):
+        for book_url in book_urls:
+            self.url_queue.put(book_url)
+        for _ in range(self.fetch_workers):
+            self.url_queue.put(DONE)
+
+    def fetch_stage(self):
+        while True:
+            book_url = self.url_queue.get()
+            if book_url is DONE:
+                self.html_queue.put(DONE)
+                return
+            # A failed fetch (None) is passed on so the tracker keeps the book
+            self.html_queue.put((book_url, self.fetch(book_url)))
+
+    def parse_stage(self, pool: ProcessPoolExecutor):
+        finished = 0
+        while finished < self.fetch_workers:
+            item = self.html_queue.get()
+            if item is DONE:
+                finished += 1
+                continue
+            book_url, html = item
+            if html is None:
+                self.parsed_queue.put((book_url, None, None))
+                continue
+            # Tracker state is only changed on the persist thread, where it is flushed
+            if self.tracker and self.tracker.page_matches(book_url, html):
+                self.parsed_queue.put((book_url, html, None))
+                continue
+            future = pool.submit(parse_in_worker, book_url, html, self.parser_backend)
+            self.parsed_queue.put((book_url, html, future))
+        self.parsed_queue.put(DONE)
+
+    def persist_stage(self):
+        batch = []
+        while True:
+            item = self.parsed_queue.get()
+            if item is DONE:
+                break
+            book_url, html, future = item
+            if html is None:
+                if self.tracker:
+                    self.tracker.mark_seen(book_url)
+                continue
+            if future is None:
+                self.tracker.mark_unchanged(book_url)
+                continue
+            if self.tracker:
+                self.tracker.mark_seen(book_url)
+            self.pages += 1
+            book, seconds = future.result()
+            # Timed in the worker, so queueing for a free process is not counted
+            self.metrics.observe('parse', seconds)
+            if book is None:
+                self.metrics.error('parse_failed')
+                continue
+            if self.tracker and not self.tracker.record(book_url, html, book):
+                continue
+            batch.append(book)
+            if len(batch) >= self.batch_size:
+                self.sink(batch)
+                batch = []
+        if batch:
+            self.sink(batch)
+
+    def run(self, book_urls: Iterable[str]) -> int:
+        """Process every URL from `book_urls`; return the number of pages parsed."""
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            threads = [threading.Thread(target=self.feed, args=(book_urls,), daemon=True)]
+            threads += [threading.Thread(target=self.fetch_stage, daemon=True)
+                        for _ in range(self.fetch_workers)]
+            threads.append(threading.Thread(
+                target=self.parse_stage, args=(pool,), daemon=True))
+            for thread in threads:
+                thread.start()
+            self.persist_stage()
+            for thread in threads:
+                thread.join()
+        return self.pages
+
+
+def scrape_all_books_pipelined(scraper: BookScraper, traversal=None, **pipeline_options) -> int:
+    """Full crawl with BookScraper's fetching and sinks and a parser process pool.
+
+    Raises TraversalError if the site's entry page could not be fetched.
+    """
+    traversal = traversal or get_traversal()
+    book_urls = traversal.book_urls(scraper)
+    if book_urls is None:
+        raise TraversalError(f"{traversal.name} traversal of {scraper.base_url} failed")
+    scraper.start_crawl()
+    complete = False
+    db = SessionLocal()
+    try:
+        pipeline = CrawlPipeline(
+            fetch=scraper.fetch_html,
+            sink=lambda batch: scraper.save_batch(batch, db),
+            tracker=scraper.tracker,
+            metrics=scraper.metrics,
+            **pipeline_options)
+        pages = pipeline.run(book_urls)
+        complete = True
+    finally:
+        db.close()
+        scraper.finish_crawl(complete)
+    scraper.metrics.report()
+    return pages
+
+
+def main():
+    with profile_run():
+        scrape_all_books_pipelined(BookScraper())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from config import QUERY_CACHE_CONFIG
+from models import Book, DataVersion
+from search import apply_search
+from stats import get_catalogue_stats
+
+logger = logging.getLogger(__name__)
+
+
+def read_data_version(db) -> int:
+    """The books data version; 0 until a crawl has written books."""
+    try:
+        return db.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        # Database created before the data_version table existed
+        db.rollback()
+        return 0
+
+
+class QueryCache:
+    """LRU cache of read-model results in front of SessionLocal queries.
+
+    Results are keyed by query name and filter parameters. Every scraper
+    commit that writes books bumps the data version
+    (persistence.bump_data_version); once a reader sees it move, all
+    entries are dropped. The version is re-read at most every
+    `check_seconds`, which bounds how stale a result can be.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_CONFIG['max_entries'],
+                 check_seconds: float = QUERY_CACHE_CONFIG['version_check_seconds'],
+                 enabled: bool = QUERY_CACHE_CONFIG['enabled']):
+        self.max_entries = max_entries
+        self.check_seconds = check_seconds
+        self.enabled = enabled
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.version: Optional[int] = None
+        self.checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, db, key: Hashable, query: Callable):
+        """`query(db)` for `key`, served from memory unless the data changed."""
+        if not self.enabled:
+            return query(db)
+        version = self.sync(db)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        result = query(db)
+        with self.lock:
+            # A result computed while the version moved is not kept
+            if version == self.version:
+                self.entries[key] = result
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def sync(self, db) -> int:
+        """Re-read the data version if it is due, dropping entries when it moved."""
+        now = time.monotonic()
+        with self.lock:
+            if self.version is not None and now - self.checked_at < self.check_seconds:
+                return self.version
+        version = read_data_version(db)
+        with self.lock:
+            self.checked_at = now
+            if version != self.version:
+                if self.entries:
+                    logger.debug(f"Data version {self.version} -> {version}: "
+                                 f"dropping {len(self.entries)} cached results")
+                    self.invalidations += 1
+                self.entries.clear()
+                self.version = version
+        return version
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.version = None
+
+    def stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self.entries),
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'data_version': self.version,
+            }
+
+
+# Shared by the GUI and view_data
+query_cache = QueryCache()
+
+
+def book_page(db, search_term: Optional[str], category: Optional[str],
+              after_id: Optional[int] = None, before_id: Optional[int] = None,
+              limit: int = 200) -> List:
+    """One keyset page of (id, title, price, ...) rows ordered by id."""
+    query = db.query(Book.id, Book.title, Book.price, Book.category,
+                     Book.rating, Book.in_stock, Book.availability)
+    query = apply_search(db, query, search_term)
+    if category:
+        query = query.filter(Book.category == category)
+    if before_id is not None:
+        rows = query.filter(Book.id < before_id).order_by(Book.id.desc()).limit(limit).all()
+        return rows[::-1]
+    if after_id is not None:
+        query = query.filter(Book.id > after_id)
+    return query.order_by(Book.id).limit(limit).all()
+
+
+def cached_book_page(db, search_term: Optional[str], category: Optional[str],
+                     after_id: Optional[int] = None, before_id: Optional[int] = None,
+                     limit: int = 200, cache: QueryCache = query_cache) -> List:
+    search_term = (search_term or '').strip() or None
+    return cache.get(db, ('page', search_term, category or None, after_id, before_id, limit),
+                     lambda db: book_page(db, search_term, category, after_id, before_id, limit))
+
+
+def cached_categories(db, cache: QueryCache = query_cache) -> List[str]:
+    return cache.get(db, ('categories',),
+                     lambda db: [row[0] for row in db.query(Book.category).distinct()])
+
+
+def cached_stats(db, cache: QueryCache = query_cache) -> Dict:
+    return cache.get(db, ('stats',), get_catalogue_stats)
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from config import SCHEDULER_CONFIG
+
+# How long to wait before re-checking a host whose in-flight slots are all taken
+POLL_INTERVAL = 0.01
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens +
+                          (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, now: float) -> float:
+        """Take a token if one is available, else return seconds until one is."""
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds: float, now: float):
+        """Drain the bucket so no token is available for `seconds`."""
+        self.refill(now)
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class HostState:
+    def __init__(self, rate: float, burst: float):
+        self.bucket = TokenBucket(rate, burst)
+        self.in_flight = 0
+        self.waiting = 0
+        self.latency = 0.0
+        self.requests = 0
+        self.backoffs = 0
+
+
+class PolitenessScheduler:
+    """Per-host token-bucket scheduler with adaptive (AIMD) rate control.
+
+    Each host gets its own bucket and in-flight limit. Throttling responses
+    (429/5xx), errors and slow responses multiply the host's rate down; fast
+    successful responses add back to it, up to `max_rate`.
+    """
+
+    def __init__(self, requests_per_second: float = 5.0, max_in_flight: int = 4,
+                 burst: float = 1.0, min_rate: float = 0.2, max_rate: float = 20.0,
+                 slow_response: float = 2.0, backoff_factor: float = 0.5,
+                 recovery_step: float = 0.5):
+        self.requests_per_second = requests_per_second
+        self.max_in_flight = max_in_flight
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.slow_response = slow_response
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.hosts: Dict[str, HostState] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, **overrides) -> 'PolitenessScheduler':
+        return cls(**{**SCHEDULER_CONFIG, **overrides})
+
+    def _host(self, url: str) -> HostState:
+        host = urlsplit(url).netloc
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState(
+                self.requests_per_second, self.burst)
+        return state
+
+    def _try_reserve(self, state: HostState) -> float:
+        """Reserve a slot for one request; return 0 or the time to wait first."""
+        if state.in_flight >= self.max_in_flight:
+            return POLL_INTERVAL
+        wait = state.bucket.try_consume(time.monotonic())
+        if not wait:
+            state.in_flight += 1
+            state.requests += 1
+        return wait
+
+    def acquire(self, url: str):
+        """Block until a request to `url`'s host may start."""
+        with self.lock:
+            state = self._host(url)
+            state.waiting += 1
+        try:
+            while True:
+                with self.lock:
+                    wait = self._try_reserve(state)
+                if not wait:
+                    return
+                time.sleep(wait)
+        finally:
+            with self.lock:
+                state.waiting -= 1
+
+    async def acquire_async(self, url: str):
+        """Wait, without blocking the event loop, until a request may start."""
+        with self.lock:
+            state = self._host(url)
+            state.waiting += 1
+        try:
+            while True:
+                with self.lock:
+                    wait = self._try_reserve(state)
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            with self.lock:
+                state.waiting -= 1
+
+    def release(self, url: str, status: Optional[int] = None,
+                latency: Optional[float] = None, retry_after: Optional[float] = None):
+        """Record the outcome of a request and adapt the host's rate.
+
+        `status` is None when the request failed without a response.
+        """
+        with self.lock:
+            state = self._host(url)
+            state.in_flight -= 1
+            bucket = state.bucket
+            if latency is not None:
+                state.latency = latency if not state.latency else (
+                    0.8 * state.latency + 0.2 * latency)
+
+            throttled = status is None or status == 429 or status >= 500
+            if throttled or (latency or 0) > self.slow_response:
+                bucket.rate = max(self.min_rate, bucket.rate * self.backoff_factor)
+                state.backoffs += 1
+                if retry_after:
+                    bucket.pause(retry_after, time.monotonic())
+            elif latency is not None and latency < self.slow_response / 4:
+                bucket.rate = min(self.max_rate, bucket.rate + self.recovery_step)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Current rate, in-flight count and queue depth for every host."""
+        with self.lock:
+            return {
+                host: {
+                    'rate': round(state.bucket.rate, 3),
+                    'in_flight': state.in_flight,
+                    'queue_depth': state.waiting,
+                    'avg_latency': round(state.latency, 4),
+                    'requests': state.requests,
+                    'backoffs': state.backoffs,
+                }
+                for host, state in self.hosts.items()
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
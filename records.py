@@ -0,0 +1,64 @@
+import sys
+from typing import Dict, NamedTuple
+
+# Book fields as the CSV export and the books table name them, prices in pounds
+BOOK_FIELDS = [
+    'title', 'price', 'availability', 'rating', 'category', 'description', 'upc',
+    'product_type', 'price_excl_tax', 'price_incl_tax', 'tax', 'num_reviews', 'in_stock'
+]
+
+
+def to_pence(price: float) -> int:
+    return int(round(price * 100))
+
+
+class BookRecord(NamedTuple):
+    """One scraped book, from the parser through every sink.
+
+    A plain tuple of typed fields: no per-instance dict, prices in integer
+    pence, and category, rating and product type interned so the records
+    of a category share one string. Fields are in BOOK_FIELDS order.
+    """
+    title: str
+    price_pence: int
+    availability: int
+    rating: str
+    category: str
+    description: str
+    upc: str
+    product_type: str
+    price_excl_tax_pence: int
+    price_incl_tax_pence: int
+    tax_pence: int
+    num_reviews: int
+    in_stock: bool
+
+    @property
+    def price(self) -> float:
+        return self.price_pence / 100
+
+    def csv_row(self) -> tuple:
+        """The record in BOOK_FIELDS order with prices in pounds."""
+        return (self.title, self.price_pence / 100, self.availability, self.rating,
+                self.category, self.description, self.upc, self.product_type,
+                self.price_excl_tax_pence / 100, self.price_incl_tax_pence / 100,
+                self.tax_pence / 100, self.num_reviews, self.in_stock)
+
+    def as_dict(self) -> Dict:
+        """Column values for the books table, prices in pounds."""
+        return dict(zip(BOOK_FIELDS, self.csv_row()))
+
+    def __reduce__(self):
+        # Records parsed in a pool process are re-interned on arrival
+        return book_record, tuple(self)
+
+
+def book_record(title: str, price_pence: int, availability: int, rating: str,
+                category: str, description: str, upc: str, product_type: str,
+                price_excl_tax_pence: int, price_incl_tax_pence: int, tax_pence: int,
+                num_reviews: int, in_stock: bool) -> BookRecord:
+    """Build a BookRecord, interning the strings many books share."""
+    return BookRecord(title, price_pence, availability, sys.intern(rating),
+                      sys.intern(category), description, upc, sys.intern(product_type),
+                      price_excl_tax_pence, price_incl_tax_pence, tax_pence,
+                      num_reviews, in_stock)
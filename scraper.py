@@ -1,11 +1,25 @@
-import requests
 from bs4 import BeautifulSoup
 import time
-from typing import List, Dict, Optional
-from models import Book, SessionLocal
-from config import BASE_URL, CATALOGUE_URL, CSV_DIR
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urljoin
+from models import SessionLocal
+from config import (BASE_URL, CATALOGUE_URL, CSV_DIR, HTTP_CACHE_CONFIG, INCREMENTAL_CRAWL,
+                    PARSER_BACKEND, PRICE_HISTORY, SHALLOW_CRAWL, STATS_SUMMARY, ensure_dir)
+from frontier import CrawlFrontier
+from history import HistoryRecorder
+from incremental import IncrementalTracker
+from parsers import SoupBookParser, clean_price, get_parser
+from persistence import (bump_data_version, ensure_data_version, update_listing_fields,
+                         upsert_books)
+from records import BOOK_FIELDS, BookRecord
+from shallow import RefreshPolicy, ShallowPlanner, parse_listing
+from stats import categories_of, refresh_category_summary
+from http_cache import ResponseCache, install_cache
+from metrics import get_metrics, profile_run
+from rate_limiter import PolitenessScheduler, parse_retry_after
+from transport import DEFAULT_HEADERS, build_session, transport_stats
+from traversal import TraversalError, get_traversal
 import logging
-import re
 import os
 import csv
 from datetime import datetime
@@ -15,174 +29,521 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 20
-CSV_FILENAME = os.path.join(
-    CSV_DIR, f'books_live_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
-CSV_HEADERS = [
-    'title', 'price', 'availability', 'rating', 'category', 'description', 'upc',
-    'product_type', 'price_excl_tax', 'price_incl_tax', 'tax', 'num_reviews', 'in_stock'
-]
+# Seconds to wait when the frontier has no URL due for this worker
+FRONTIER_IDLE_SECONDS = 1
 
 
-def write_books_to_csv(books: List[Dict], file_path: str, write_header: bool = False):
+def csv_filename(when: Optional[datetime] = None) -> str:
+    """Timestamped path of a crawl's live CSV export."""
+    when = when or datetime.now()
+    return os.path.join(ensure_dir(CSV_DIR),
+                        f'books_live_export_{when.strftime("%Y%m%d_%H%M%S")}.csv')
+
+
+def __getattr__(name: str):
+    # CSV_FILENAME is stamped on first use rather than at import
+    if name == 'CSV_FILENAME':
+        globals()[name] = csv_filename()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+CSV_HEADERS = BOOK_FIELDS
+
+
+def write_books_to_csv(books: List[BookRecord], file_path: str, write_header: bool = False):
     """Append a batch of books to the CSV file."""
     with open(file_path, 'a', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
+        writer = csv.writer(csvfile)
         if write_header:
-            writer.writeheader()
-        for book in books:
-            writer.writerow(book)
+            writer.writerow(CSV_HEADERS)
+        writer.writerows(book.csv_row() for book in books)
+
+
+def listing_page_url(category_url: str, page_num: int) -> str:
+    """Build the URL of a category listing page."""
+    if page_num == 1:
+        return category_url
+    return urljoin(category_url, f"page-{page_num}.html")
 
 
 class BookScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+    def __init__(self, base_url: str = BASE_URL,
+                 scheduler: Optional[PolitenessScheduler] = None,
+                 cache: Optional[ResponseCache] = None,
+                 offline: bool = HTTP_CACHE_CONFIG['offline'],
+                 incremental: bool = INCREMENTAL_CRAWL,
+                 parser_backend: str = PARSER_BACKEND,
+                 history: bool = PRICE_HISTORY):
+        self.base_url = base_url.rstrip('/')
+        self.parser = get_parser(parser_backend)
+        self.scheduler = scheduler or PolitenessScheduler.from_config()
+        self.session = build_session()
+        self.offline = offline
+        self.cache = None
+        if cache is not None or HTTP_CACHE_CONFIG['enabled'] or offline:
+            self.cache = install_cache(self.session, cache, offline=offline)
+        self.headers = dict(DEFAULT_HEADERS)
+        self.csv_path = csv_filename()
         self.csv_initialized = False
+        self.books_saved = 0
+        self.incremental = incremental
+        self.tracker: Optional[IncrementalTracker] = None
+        self.record_history = history
+        self.history: Optional[HistoryRecorder] = None
+        self.data_version_ready = False
+        self.metrics = get_metrics()
 
-    def get_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch and parse a webpage."""
+    def fetch_html(self, url: str) -> Optional[str]:
+        """Fetch a webpage and return its HTML."""
+        if self.offline:
+            return self.fetch_cached_html(url)
+        self.scheduler.acquire(url)
+        start = time.perf_counter()
+        status, latency, retry_after = None, None, None
         try:
-            response = self.session.get(url, headers=self.headers)
+            response = self.session.get(url)
+            latency = time.perf_counter() - start
+            status = response.status_code
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
             response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
+            self.record_fetch(len(response.content), latency,
+                              getattr(response, 'from_cache', False))
+            return response.text
         except Exception as e:
             logger.error(f"Error fetching {url}: {str(e)}")
+            self.record_fetch_error(e, status)
+            return None
+        finally:
+            self.scheduler.release(url, status, latency, retry_after)
+
+    def record_fetch(self, size: int, latency: float, from_cache: bool):
+        if not self.metrics.enabled:
+            return
+        self.metrics.observe('fetch', latency)
+        self.metrics.inc('pages_fetched')
+        self.metrics.inc('bytes_fetched', size)
+        if self.cache:
+            self.metrics.inc('cache_hits' if from_cache else 'cache_misses')
+
+    def record_fetch_error(self, error: Exception, status: Optional[int]):
+        self.metrics.error(f"http_{status}" if status and status >= 400
+                           else type(error).__name__)
+
+    def fetch_cached_html(self, url: str) -> Optional[str]:
+        """Replay a page from the HTTP cache without touching the network."""
+        try:
+            return self.session.get(url).text
+        except Exception as e:
+            logger.error(f"Error replaying {url}: {str(e)}")
             return None
 
+    def get_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Fetch and parse a webpage."""
+        html = self.fetch_html(url)
+        if html is None:
+            return None
+        return BeautifulSoup(html, 'html.parser')
+
     def clean_price(self, price_str: str) -> float:
         """Clean price string and convert to float."""
-        try:
-            # Remove any special characters and convert to float
-            cleaned_price = re.sub(r'[^\d.]', '', price_str)
-            return float(cleaned_price)
-        except (ValueError, TypeError):
-            logger.error(f"Error cleaning price: {price_str}")
-            return 0.0
-
-    def get_book_details(self, book_url: str) -> Optional[Dict]:
-        """Extract detailed information from a book's page."""
-        soup = self.get_page(book_url)
-        if not soup:
+        return clean_price(price_str)
+
+    def get_book_details(self, book_url: str) -> Optional[BookRecord]:
+        """Extract detailed information from a book's page.
+
+        In incremental mode, returns None for books that have not changed.
+        """
+        html = self.fetch_html(book_url)
+        if html is None:
+            if self.tracker:
+                # Still listed, so the book keeps its fingerprint
+                self.tracker.mark_seen(book_url)
             return None
+        return self.extract_book(book_url, html)
 
+    def extract_book(self, book_url: str, html: str) -> Optional[BookRecord]:
+        """Parse a fetched product page, skipping it if it is unchanged."""
+        if self.tracker and self.tracker.is_unchanged_page(book_url, html):
+            return None
+        with self.metrics.timer('parse'):
+            book = self.parser.parse_book(html, book_url)
+        if book is None:
+            self.metrics.error('parse_failed')
+        if book and self.tracker and not self.tracker.record(book_url, html, book):
+            return None
+        return book
+
+    def parse_book_details(self, soup: BeautifulSoup, book_url: str) -> Optional[BookRecord]:
+        """Extract book information from an already parsed product page."""
+        return SoupBookParser().parse_soup(soup, book_url)
+
+    def parse_book_links(self, soup: BeautifulSoup) -> List[str]:
+        """Return the product page URLs listed on a category page."""
+        return [
+            f"{self.base_url}/catalogue/{book.find('a')['href'].replace('../', '')}"
+            for book in soup.find_all('h3')
+        ]
+
+    def parse_category_urls(self, soup: BeautifulSoup) -> List[str]:
+        """Return the category URLs from the home page sidebar."""
+        categories = soup.find('div', class_='side_categories').find_all('a')
+        # Skip the first 'Books' category (it's a superset)
+        return [f"{self.base_url}/{category['href']}" for category in categories[1:]]
+
+    def has_next_page(self, soup: BeautifulSoup) -> bool:
+        """Check whether a listing page links to a further page."""
+        return soup.find('li', class_='next') is not None
+
+    def next_page_url(self, soup: BeautifulSoup, url: str) -> Optional[str]:
+        """Resolve the 'next' link of the listing page at `url`."""
+        next_button = soup.find('li', class_='next')
+        if next_button is None or next_button.find('a') is None:
+            return None
+        return urljoin(url, next_button.find('a')['href'])
+
+    def save_batch(self, books_batch: List[BookRecord], db):
+        """Write a batch of books to the CSV file and the database.
+
+        Returns False if the database write failed and was rolled back.
+        """
+        # Write to CSV
+        with self.metrics.timer('csv_write'):
+            write_books_to_csv(books_batch, self.csv_path,
+                               write_header=not self.csv_initialized)
+        self.csv_initialized = True
+        # Write to DB
+        start = time.perf_counter()
         try:
-            # Extract book information
-            product_info = {}
-            table = soup.find('table', class_='table-striped')
-            if table:
-                for row in table.find_all('tr'):
-                    header = row.find('th').text.strip()
-                    value = row.find('td').text.strip()
-                    product_info[header] = value
-
-            # Extract other details
-            title = soup.find('h1').text.strip()
-            price_text = soup.find('p', class_='price_color').text.strip()
-            price = self.clean_price(price_text)
-
-            availability_text = soup.find(
-                'p', class_='availability').text.strip()
-            availability = int(re.search(r'\d+', availability_text).group()
-                               if re.search(r'\d+', availability_text) else '0')
-
-            rating = soup.find('p', class_='star-rating')['class'][1]
-            description = soup.find('div', id='product_description')
-            description = description.find_next(
-                'p').text.strip() if description else ''
-            category = soup.find('ul', class_='breadcrumb').find_all('li')[
-                2].text.strip()
-
-            return {
-                'title': title,
-                'price': price,
-                'availability': availability,
-                'rating': rating,
-                'category': category,
-                'description': description,
-                'upc': product_info.get('UPC', ''),
-                'product_type': product_info.get('Product Type', ''),
-                'price_excl_tax': self.clean_price(product_info.get('Price (excl. tax)', '0')),
-                'price_incl_tax': self.clean_price(product_info.get('Price (incl. tax)', '0')),
-                'tax': self.clean_price(product_info.get('Tax', '0')),
-                'num_reviews': int(product_info.get('Number of reviews', '0')),
-                'in_stock': availability > 0
-            }
+            self.ensure_data_version(db)
+            if STATS_SUMMARY:
+                # A re-categorised book also changes its old category's stats
+                touched = set(categories_of(db, [book.upc for book in books_batch]))
+                touched.update(book.category for book in books_batch)
+            upsert_books(db, books_batch)
+            if STATS_SUMMARY:
+                refresh_category_summary(db, touched)
+            if self.tracker:
+                self.tracker.flush(db, books_batch)
+            if self.history:
+                self.history.record(db, books_batch)
+            bump_data_version(db)
+            db.commit()
+            if self.tracker:
+                self.tracker.commit(books_batch)
+            if self.history:
+                self.history.commit()
+            self.metrics.observe('db_batch', time.perf_counter() - start)
+            self.metrics.inc('books_saved', len(books_batch))
+            self.books_saved += len(books_batch)
+            return True
         except Exception as e:
-            logger.error(
-                f"Error parsing book details from {book_url}: {str(e)}")
-            return None
+            db.rollback()
+            if self.tracker:
+                self.tracker.rollback(books_batch)
+            if self.history:
+                self.history.rollback()
+            logger.error(f"DB error writing batch of {len(books_batch)} books: {e}")
+            self.metrics.error(f"db_{type(e).__name__}")
+            return False
 
-    def get_category_books(self, category_url: str):
-        books_batch = []
+    def ensure_data_version(self, db):
+        """Create the data_version table once, before this scraper's first write.
+
+        It runs on its own connection, outside any books transaction, so a
+        failure here costs no batch.
+        """
+        if not self.data_version_ready:
+            ensure_data_version(db.get_bind())
+            self.data_version_ready = True
+
+    def listing_pages(self, category_url: str):
+        """Yield (soup, book URLs) for each listing page of a category."""
         page_num = 1
+        while True:
+            url = listing_page_url(category_url, page_num)
+            soup = self.get_page(url)
+            if not soup:
+                self.listing_failed(url)
+                return
+            book_urls = self.parse_book_links(soup)
+            if not book_urls:
+                return
+            yield soup, book_urls
+            if not self.has_next_page(soup):
+                return
+            page_num += 1
+
+    def listing_failed(self, url: str):
+        """Note a listing page that could not be fetched.
+
+        The books it lists were not enumerated, so this crawl cannot tell
+        which books left the catalogue.
+        """
+        logger.warning(f"Listing page failed, books it lists are not crawled: {url}")
+        if self.tracker:
+            self.tracker.mark_incomplete()
+
+    def get_category_books(self, category_url: str,
+                           select_urls: Optional[Callable] = None):
+        """Scrape a category's books.
+
+        `select_urls(soup, book_urls, db)` may narrow down which product
+        pages of each listing page are fetched.
+        """
         db = SessionLocal()
         try:
-            while True:
-                url = f"{category_url}/page-{page_num}.html" if page_num > 1 else category_url
-                soup = self.get_page(url)
-                if not soup:
-                    break
-                book_links = soup.find_all('h3')
-                if not book_links:
-                    break
-                for book in book_links:
-                    book_url = f"{BASE_URL}/catalogue/{book.find('a')['href'].replace('../', '')}"
-                    book_details = self.get_book_details(book_url)
-                    if book_details:
-                        books_batch.append(book_details)
-                    if len(books_batch) >= BATCH_SIZE:
-                        # Write to CSV
-                        write_books_to_csv(
-                            books_batch, CSV_FILENAME, write_header=not self.csv_initialized)
-                        self.csv_initialized = True
-                        # Write to DB
-                        for book_data in books_batch:
-                            try:
-                                db.merge(Book(**book_data))
-                            except Exception as e:
-                                logger.error(
-                                    f"DB error for book {book_data.get('title')}: {e}")
-                        db.commit()
-                        books_batch.clear()
-                    time.sleep(1)
-                next_button = soup.find('li', class_='next')
-                if not next_button:
-                    break
-                page_num += 1
-                time.sleep(1)
-            # Write any remaining books
-            if books_batch:
-                write_books_to_csv(books_batch, CSV_FILENAME,
-                                   write_header=not self.csv_initialized)
-                self.csv_initialized = True
-                for book_data in books_batch:
-                    try:
-                        db.merge(Book(**book_data))
-                    except Exception as e:
-                        logger.error(
-                            f"DB error for book {book_data.get('title')}: {e}")
-                db.commit()
+            pages = self.listing_pages(category_url)
+            if select_urls is None:
+                book_urls = (url for _, urls in pages for url in urls)
+            else:
+                book_urls = (url for soup, urls in pages for url in select_urls(soup, urls, db))
+            self.scrape_book_urls(book_urls, db)
+        finally:
+            db.close()
+
+    def scrape_book_urls(self, book_urls: Iterable[str], db):
+        """Fetch, parse and save product pages in batches of BATCH_SIZE."""
+        books_batch = []
+        for book_url in book_urls:
+            book_details = self.get_book_details(book_url)
+            if book_details:
+                books_batch.append(book_details)
+            if len(books_batch) >= BATCH_SIZE:
+                self.save_batch(books_batch, db)
+                books_batch.clear()
+        # Write any remaining books
+        if books_batch:
+            self.save_batch(books_batch, db)
+
+    def save_listing_updates(self, books: List[Dict], db) -> bool:
+        """Write fields read off a listing page to books already stored."""
+        try:
+            self.ensure_data_version(db)
+            update_listing_fields(db, books)
+            if STATS_SUMMARY:
+                refresh_category_summary(db, categories_of(db, [book['upc'] for book in books]))
+            if self.history:
+                self.history.record(db, books)
+            bump_data_version(db)
+            db.commit()
+            if self.history:
+                self.history.commit()
+            self.metrics.inc('listing_updates', len(books))
+            return True
+        except Exception as e:
+            db.rollback()
+            if self.history:
+                self.history.rollback()
+            logger.error(f"DB error writing {len(books)} listing updates: {e}")
+            self.metrics.error(f"db_{type(e).__name__}")
+            return False
+
+    def start_crawl(self):
+        """Set up incremental tracking and price history for a full crawl."""
+        self.start_incremental()
+        self.start_history()
+
+    def finish_crawl(self, complete: bool = True):
+        """Close the crawl's history and fingerprints; `complete=False` if it was cut short."""
+        self.finish_history()
+        return self.finish_incremental(complete)
+
+    def start_history(self, crawl_id: Optional[int] = None):
+        """Open a crawl in the price history, or join `crawl_id`, if history is on."""
+        if not self.record_history:
+            return
+        db = SessionLocal()
+        try:
+            self.history = HistoryRecorder(db, crawl_id)
+        finally:
+            db.close()
+
+    def finish_history(self):
+        if not self.history:
+            return
+        db = SessionLocal()
+        try:
+            self.history.finish(db)
         finally:
             db.close()
+            self.history = None
 
-    def scrape_all_books(self):
-        soup = self.get_page(BASE_URL)
+    def start_incremental(self):
+        """Load the previous crawl's fingerprints if incremental mode is on."""
+        if not self.incremental:
+            return
+        db = SessionLocal()
+        try:
+            self.tracker = IncrementalTracker(db)
+        finally:
+            db.close()
+
+    def finish_incremental(self, complete: bool = True):
+        """Persist fingerprints and log new/changed/unchanged/removed counts."""
+        if not self.tracker:
+            return None
+        db = SessionLocal()
+        try:
+            report = self.tracker.finish(db, complete)
+        finally:
+            db.close()
+            self.tracker = None
+        logger.info(f"Incremental crawl: {report}")
+        return report
+
+    def scrape_all_books(self, traversal=None):
+        """Full crawl; `traversal` decides how book URLs are enumerated.
+
+        Raises TraversalError if the site's entry page could not be fetched.
+        """
+        traversal = traversal or get_traversal()
+        book_urls = traversal.book_urls(self)
+        if book_urls is None:
+            raise TraversalError(f"{traversal.name} traversal of {self.base_url} failed")
+        self.start_crawl()
+        complete = False
+        db = SessionLocal()
+        try:
+            self.scrape_book_urls(book_urls, db)
+            complete = True
+        finally:
+            db.close()
+            self.finish_crawl(complete)
+        logger.info(f"Scheduler stats: {self.scheduler.stats()}")
+        logger.info(f"Transport stats: {transport_stats(self.session)}")
+        if self.cache:
+            logger.info(f"HTTP cache stats: {self.cache.stats()}")
+        self.metrics.report()
+
+    def scrape_shallow(self, policy: Optional[RefreshPolicy] = None):
+        """Cheap price-monitoring crawl driven by the listing pages.
+
+        Title, price, rating and stock are read off each listing page, 20
+        books per request, and written straight to known books. Detail pages
+        are only fetched for the books `policy` picks: new books, books not
+        fetched for a while and, optionally, books whose stock or price moved.
+        Raises TraversalError if the home page could not be fetched.
+        """
+        soup = self.get_page(self.base_url)
         if not soup:
+            raise TraversalError(f"Could not fetch the home page {self.base_url}")
+        # Page fingerprints map listing URLs to UPCs and record fetch times.
+        # Incremental mode is only forced for this call.
+        incremental, self.incremental = self.incremental, True
+        complete = False
+        try:
+            self.start_crawl()
+            db = SessionLocal()
+            try:
+                planner = ShallowPlanner(db, policy)
+            finally:
+                db.close()
+
+            def select_urls(listing: BeautifulSoup, book_urls: List[str], db) -> List[str]:
+                entries = parse_listing(listing, book_urls)
+                for entry in entries:
+                    self.tracker.mark_seen(entry.url)
+                updates, detail_urls = planner.plan(entries)
+                if updates:
+                    self.save_listing_updates(updates, db)
+                return detail_urls
+
+            for category_url in self.parse_category_urls(soup):
+                logger.info(f"Scraping category listings: {category_url}")
+                self.get_category_books(category_url, select_urls)
+            complete = True
+        finally:
+            self.incremental = incremental
+            self.finish_crawl(complete)
+        logger.info(f"Shallow crawl: {planner.counts}")
+        self.metrics.report()
+        return planner.counts
+
+    def scrape_frontier(self, frontier: CrawlFrontier, kinds: Optional[List[str]] = None,
+                        crawl_id: Optional[int] = None):
+        """Crawl by consuming a persistent frontier.
+
+        Every URL's state is stored, so a run that dies midway resumes where
+        it stopped, failed pages are retried with backoff instead of being
+        abandoned, and several processes can share one frontier. Books are
+        marked done only once their batch is committed. Removal tracking of
+        incremental mode is not available here.
+
+        `kinds` limits which URLs this process claims (e.g. only 'book' for
+        a distributed worker); it still runs until the whole frontier is done.
+        Price history goes to `crawl_id` when given, so that all workers of
+        one distributed crawl share a crawl.
+        """
+        frontier.reclaim_stale()
+        frontier.add([self.base_url], 'home')
+        books_batch, batch_items = [], []
+        self.start_history(crawl_id)
+        db = SessionLocal()
+        stop_heartbeat = frontier.start_heartbeat()
+
+        def flush():
+            if self.save_batch(books_batch, db):
+                frontier.complete(batch_items)
+            else:
+                for item in batch_items:
+                    frontier.fail(item, 'database write failed')
+            books_batch.clear()
+            batch_items.clear()
+
+        try:
+            while True:
+                items = frontier.claim(kinds=kinds)
+                if not items:
+                    if books_batch:
+                        flush()
+                    if not frontier.has_work():
+                        break
+                    # Other workers hold the remaining URLs, or retries are backing off
+                    time.sleep(FRONTIER_IDLE_SECONDS)
+                    frontier.reclaim_stale()
+                    continue
+                for item in items:
+                    html = self.fetch_html(item.url)
+                    if html is None:
+                        frontier.fail(item, 'fetch failed')
+                    elif item.kind == 'book':
+                        book = self.extract_book(item.url, html)
+                        if book is None:
+                            frontier.fail(item, 'parse failed')
+                            continue
+                        books_batch.append(book)
+                        batch_items.append(item)
+                        if len(books_batch) >= BATCH_SIZE:
+                            flush()
+                    else:
+                        self.expand_frontier(frontier, item, BeautifulSoup(html, 'html.parser'))
+                        frontier.complete([item])
+        finally:
+            stop_heartbeat.set()
+            db.close()
+        self.finish_history()
+        logger.info(f"Scheduler stats: {self.scheduler.stats()}")
+        self.metrics.report()
+
+    def expand_frontier(self, frontier: CrawlFrontier, item, soup: BeautifulSoup):
+        """Enqueue the URLs discovered on a home or listing page."""
+        if item.kind == 'home':
+            frontier.add(self.parse_category_urls(soup), 'listing')
             return
-        categories = soup.find('div', class_='side_categories').find_all('a')
-        # Skip the first 'Books' category (it's a superset)
-        for category in categories[1:]:
-            category_url = f"{BASE_URL}/{category['href']}"
-            logger.info(f"Scraping category: {category.text.strip()}")
-            self.get_category_books(category_url)
-            time.sleep(2)
+        frontier.add(self.parse_book_links(soup), 'book')
+        next_url = self.next_page_url(soup, item.url)
+        if next_url:
+            frontier.add([next_url], 'listing')
 
 
 def main():
     scraper = BookScraper()
-    scraper.scrape_all_books()
+    with profile_run():
+        if SHALLOW_CRAWL:
+            scraper.scrape_shallow()
+        else:
+            scraper.scrape_all_books()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+import logging
+import re
+from typing import List, Optional
+
+from sqlalchemy import Integer, column, or_, table, text
+
+from models import Book
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'books_fts'
+
+# External-content FTS5 index over books.title/description, kept in sync by
+# triggers so every write path (ORM, bulk upsert, manual SQL) is covered.
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='books', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, description ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+# Title matches rank above description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_index_ready = {}
+
+
+def ensure_search_index(bind) -> bool:
+    """Create (and on first creation, populate) the FTS5 index.
+
+    Returns False when the database is not SQLite or SQLite was built
+    without FTS5; searches then fall back to ILIKE.
+    """
+    key = str(bind.engine.url)
+    if key in _index_ready:
+        return _index_ready[key]
+    ready = False
+    if bind.dialect.name == 'sqlite':
+        try:
+            with bind.engine.begin() as conn:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                    {'name': FTS_TABLE}).first()
+                for statement in FTS_SCHEMA:
+                    conn.execute(text(statement))
+                if not exists:
+                    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            ready = True
+        except Exception as e:
+            logger.warning(f"Full-text search unavailable, using ILIKE: {e}")
+    _index_ready[key] = ready
+    return ready
+
+
+def match_expression(term: str) -> Optional[str]:
+    """Turn user input into an FTS5 query: every word, prefix-matched."""
+    words = re.findall(r'\w+', term)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def fts_ready(db, term: Optional[str]) -> bool:
+    return bool(match_expression(term or '')) and ensure_search_index(db.get_bind())
+
+
+def apply_search(db, query, term: Optional[str]):
+    """Restrict an ORM query over Book to books whose title or description match."""
+    if not term or not term.strip():
+        return query
+    if fts_ready(db, term):
+        ids = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match") \
+            .bindparams(match=match_expression(term)) \
+            .columns(column('rowid', Integer))
+        return query.filter(Book.id.in_(ids))
+    pattern = f"%{term}%"
+    return query.filter(or_(Book.title.ilike(pattern), Book.description.ilike(pattern)))
+
+
+def search_books(db, term: str, category: Optional[str] = None,
+                 limit: int = 50, offset: int = 0) -> List[Book]:
+    """Books matching `term`, best matches first (BM25, titles weighted up)."""
+    query = db.query(Book)
+    if category:
+        query = query.filter(Book.category == category)
+    if fts_ready(db, term):
+        fts = table(FTS_TABLE, column('rowid', Integer))
+        query = query.join(fts, fts.c.rowid == Book.id) \
+            .filter(text(f"{FTS_TABLE} MATCH :match")) \
+            .params(match=match_expression(term)) \
+            .order_by(text(f"bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT})"))
+    else:
+        pattern = f"%{term}%"
+        query = query.filter(or_(Book.title.ilike(pattern), Book.description.ilike(pattern))) \
+            .order_by(Book.title.ilike(pattern).desc(), Book.id)
+    return query.offset(offset).limit(limit).all()
@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from config import SHALLOW_CONFIG
+from models import Book, PageFingerprint
+from parsers import clean_price
+
+logger = logging.getLogger(__name__)
+
+
+class ListingEntry(NamedTuple):
+    """What a category listing page shows about one book."""
+    url: str
+    title: str
+    price: float
+    rating: str
+    in_stock: bool
+
+
+class KnownBook(NamedTuple):
+    upc: str
+    title: str
+    price: float
+    rating: str
+    in_stock: bool
+    last_fetched: Optional[datetime]
+
+
+def parse_listing(soup: BeautifulSoup, book_urls: List[str]) -> List[ListingEntry]:
+    """Pair each product pod on a listing page with its resolved product URL."""
+    entries = []
+    for pod, url in zip(soup.find_all('article', class_='product_pod'), book_urls):
+        link = pod.find('h3').find('a')
+        availability = pod.find('p', class_='availability')
+        entries.append(ListingEntry(
+            url=url,
+            title=link.get('title') or link.text.strip(),
+            price=clean_price(pod.find('p', class_='price_color').text.strip()),
+            rating=pod.find('p', class_='star-rating')['class'][1],
+            in_stock=availability is not None and 'In stock' in availability.text,
+        ))
+    return entries
+
+
+class RefreshPolicy:
+    """Decide when a book seen on a listing page needs its detail page.
+
+    New books and books whose detail page is older than `max_age` are always
+    fetched. A stock flip is fetched by default, since only the detail page
+    has the available count; a price change only if `on_price_change`.
+    """
+
+    def __init__(self, max_age_days: float = SHALLOW_CONFIG['max_age_days'],
+                 on_price_change: bool = SHALLOW_CONFIG['refetch_on_price_change'],
+                 on_stock_change: bool = SHALLOW_CONFIG['refetch_on_stock_change']):
+        self.max_age = timedelta(days=max_age_days)
+        self.on_price_change = on_price_change
+        self.on_stock_change = on_stock_change
+
+    def detail_reason(self, entry: ListingEntry, known: Optional[KnownBook],
+                      now: datetime) -> Optional[str]:
+        """Why the detail page must be fetched, or None if the listing suffices."""
+        if known is None:
+            return 'new'
+        if known.last_fetched is None or now - known.last_fetched > self.max_age:
+            return 'stale'
+        if self.on_stock_change and entry.in_stock != known.in_stock:
+            return 'stock'
+        if self.on_price_change and entry.price != known.price:
+            return 'price'
+        return None
+
+
+class ShallowPlanner:
+    """Split listing entries into listing-only updates and detail fetches.
+
+    Books are matched to listing entries by URL through the page
+    fingerprints that incremental crawls keep, loaded once up front.
+    """
+
+    def __init__(self, db, policy: Optional[RefreshPolicy] = None):
+        self.policy = policy or RefreshPolicy()
+        rows = db.query(PageFingerprint.url, Book.upc, Book.title, Book.price, Book.rating,
+                        Book.in_stock, PageFingerprint.last_seen) \
+            .join(Book, Book.upc == PageFingerprint.upc)
+        self.known: Dict[str, KnownBook] = {url: KnownBook(*fields) for url, *fields in rows}
+        self.counts: Dict[str, int] = {'listed': 0, 'listing_updates': 0}
+
+    def plan(self, entries: List[ListingEntry]) -> Tuple[List[Dict], List[str]]:
+        """Return (listing field updates keyed by UPC, URLs needing a detail fetch)."""
+        now = datetime.utcnow()
+        updates, detail_urls = [], []
+        for entry in entries:
+            self.counts['listed'] += 1
+            known = self.known.get(entry.url)
+            reason = self.policy.detail_reason(entry, known, now)
+            if reason:
+                self.counts[reason] = self.counts.get(reason, 0) + 1
+                detail_urls.append(entry.url)
+                continue
+            fields = (entry.title, entry.price, entry.rating, entry.in_stock)
+            if fields != (known.title, known.price, known.rating, known.in_stock):
+                updates.append({'upc': known.upc, 'title': entry.title, 'price': entry.price,
+                                'rating': entry.rating, 'in_stock': entry.in_stock})
+                self.known[entry.url] = known._replace(
+                    title=entry.title, price=entry.price, rating=entry.rating,
+                    in_stock=entry.in_stock)
+        self.counts['listing_updates'] += len(updates)
+        return updates, detail_urls
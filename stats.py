@@ -0,0 +1,143 @@
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import STATS_SUMMARY
+
+# SQLAlchemy and the models are imported inside the ORM functions, so the
+# CLI can print stats through sqlite3 alone (see sqlite_category_rows)
+AGGREGATE_SQL = ("SELECT category, COUNT(id), SUM(price), MIN(price), MAX(price) "
+                 "FROM books GROUP BY category")
+SUMMARY_SQL = "SELECT category, book_count, price_sum, price_min, price_max FROM category_stats"
+
+
+def sqlite_category_rows(path: str, use_summary: bool = STATS_SUMMARY) -> Optional[List[tuple]]:
+    """Per-category (category, count, sum, min, max) rows read with the stdlib driver.
+
+    Returns None when the ORM path is needed instead: the file or table is
+    missing, or the summary table is empty and has to be built first.
+    """
+    if not Path(path).is_file():
+        return None
+    try:
+        with closing(sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro",
+                                     uri=True)) as conn:
+            rows = conn.execute(SUMMARY_SQL if use_summary else AGGREGATE_SQL).fetchall()
+    except sqlite3.Error:
+        return None
+    if use_summary and not rows:
+        return None
+    return rows
+
+
+def category_aggregates(db, categories: Optional[Iterable[str]] = None):
+    """Per-category count, price sum, min and max in one grouped query."""
+    from sqlalchemy import func
+    from models import Book
+
+    query = db.query(
+        Book.category,
+        func.count(Book.id),
+        func.sum(Book.price),
+        func.min(Book.price),
+        func.max(Book.price),
+    ).group_by(Book.category)
+    if categories is not None:
+        query = query.filter(Book.category.in_(list(categories)))
+    return query.all()
+
+
+def summarize(rows) -> Dict:
+    """Combine per-category (category, count, sum, min, max) rows into totals."""
+    per_category = []
+    total_books, total_price = 0, 0.0
+    price_min, price_max = None, None
+    for category, count, price_sum, low, high in rows:
+        if not count:
+            continue
+        price_sum = price_sum or 0.0
+        per_category.append({
+            'category': category,
+            'count': count,
+            'min_price': low,
+            'avg_price': price_sum / count,
+            'max_price': high,
+        })
+        total_books += count
+        total_price += price_sum
+        if low is not None:
+            price_min = low if price_min is None else min(price_min, low)
+        if high is not None:
+            price_max = high if price_max is None else max(price_max, high)
+    per_category.sort(key=lambda row: row['category'] or '')
+    return {
+        'total_books': total_books,
+        'categories': len(per_category),
+        'avg_price': total_price / total_books if total_books else 0.0,
+        'min_price': price_min or 0.0,
+        'max_price': price_max or 0.0,
+        'per_category': per_category,
+    }
+
+
+def refresh_category_summary(db, categories: Optional[Iterable[str]] = None):
+    """Recompute summary rows for `categories` (all if None); the caller commits."""
+    from models import CategoryStats
+
+    if categories is not None:
+        categories = set(categories)
+        if not categories:
+            return
+    rows = category_aggregates(db, categories)
+    if categories is None:
+        db.query(CategoryStats).delete()
+    else:
+        # Categories that no longer have any books drop out of the summary
+        emptied = categories - {row[0] for row in rows}
+        if emptied:
+            db.query(CategoryStats).filter(
+                CategoryStats.category.in_(emptied)).delete(synchronize_session=False)
+    now = datetime.utcnow()
+    for category, count, price_sum, low, high in rows:
+        db.merge(CategoryStats(category=category, book_count=count, price_sum=price_sum,
+                               price_min=low, price_max=high, updated_at=now))
+
+
+def get_catalogue_stats(db, use_summary: bool = STATS_SUMMARY) -> Dict:
+    """Totals, per-category counts and price min/mean/max.
+
+    Reads the category_stats summary table when `use_summary` is set
+    (building it on first use), otherwise runs one grouped query over books.
+    Either way the cost is one query returning one row per category.
+    """
+    from sqlalchemy.exc import OperationalError
+    from models import Book, CategoryStats
+
+    if use_summary:
+        try:
+            rows = db.query(CategoryStats.category, CategoryStats.book_count,
+                            CategoryStats.price_sum, CategoryStats.price_min,
+                            CategoryStats.price_max).all()
+        except OperationalError:
+            # Database created before the summary table existed
+            db.rollback()
+            CategoryStats.__table__.create(db.get_bind(), checkfirst=True)
+            rows = []
+        if not rows and db.query(Book.id).first() is not None:
+            refresh_category_summary(db)
+            db.commit()
+            return get_catalogue_stats(db, use_summary)
+        return summarize(rows)
+    return summarize(category_aggregates(db))
+
+
+def categories_of(db, upcs: List[str]) -> List[str]:
+    """Current categories of the given UPCs, before they are overwritten."""
+    from models import Book
+
+    if not upcs:
+        return []
+    return [row[0] for row in
+            db.query(Book.category).filter(Book.upc.in_(upcs)).distinct()]
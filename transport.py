@@ -0,0 +1,238 @@
+import importlib.util
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+from config import TRANSPORT_CONFIG
+
+try:
+    import httpx
+except ImportError:  # HTTP/2 is optional
+    httpx = None
+
+# urllib3 and aiohttp decode brotli bodies when either package is installed
+BROTLI = any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi'))
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+ACCEPT_ENCODING = 'gzip, deflate, br' if BROTLI else 'gzip, deflate'
+DEFAULT_HEADERS = {'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING}
+
+
+def build_retry(config: Dict = TRANSPORT_CONFIG) -> Retry:
+    """Retry connection errors and 429/5xx GETs with jittered exponential backoff.
+
+    Retry-After is honoured. The final response is returned rather than
+    raised, so the politeness scheduler still sees the throttling status.
+    """
+    return Retry(
+        total=config['retries'],
+        backoff_factor=config['backoff_factor'],
+        backoff_jitter=config['backoff_jitter'],
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET', 'HEAD'),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+class HTTPXBody:
+    """File-like body of a streamed httpx response, for requests' Response.raw."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.chunks = reply.iter_bytes()
+        self.buffer = b''
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        while amt is None or len(self.buffer) < amt:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if amt is None:
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:amt], self.buffer[amt:]
+        return data
+
+    def close(self):
+        self.reply.close()
+
+
+class TunedAdapter(HTTPAdapter):
+    """HTTPAdapter with sized keep-alive pools, timeouts, retries and reuse stats.
+
+    With `http2` (and httpx installed) requests are sent over a multiplexed
+    HTTP/2 connection per host instead of the urllib3 pools.
+    """
+
+    def __init__(self, config: Dict = TRANSPORT_CONFIG, **kwargs):
+        self.transport_config = config
+        self.timeout = (config['connect_timeout'], config['read_timeout'])
+        self.retried = 0
+        self.http2 = False
+        # One HTTP/2 client per TLS verification setting; httpx fixes it per client
+        self.http2_clients: Dict = {}
+        self.http2_requests = 0
+        self.stats_lock = threading.Lock()
+        kwargs.setdefault('pool_connections', config['pool_connections'])
+        kwargs.setdefault('pool_maxsize', config['pool_maxsize'])
+        kwargs.setdefault('max_retries', build_retry(config))
+        super().__init__(**kwargs)
+        if config['http2']:
+            if httpx is None:
+                logger.warning("HTTP/2 requested but httpx is not installed; using HTTP/1.1")
+            else:
+                self.http2 = True
+
+    def http2_client(self, verify=True):
+        with self.stats_lock:
+            client = self.http2_clients.get(verify)
+            if client is None:
+                # httpx ignores client-level limits once a transport is given
+                transport = httpx.HTTPTransport(
+                    http2=True, verify=verify, retries=self.transport_config['retries'],
+                    limits=httpx.Limits(max_connections=self.transport_config['pool_maxsize']))
+                client = self.http2_clients[verify] = httpx.Client(http2=True,
+                                                                   transport=transport)
+            return client
+
+    def send(self, request, timeout=None, **kwargs):
+        timeout = timeout or self.timeout
+        if self.http2:
+            return self.send_http2(request, timeout, kwargs.get('verify', True),
+                                   kwargs.get('stream', False))
+        response = super().send(request, timeout=timeout, **kwargs)
+        retries = getattr(response.raw, 'retries', None)
+        if retries is not None and retries.history:
+            with self.stats_lock:
+                self.retried += len(retries.history)
+        return response
+
+    def send_http2(self, request, timeout, verify=True, stream: bool = False) -> requests.Response:
+        """Send over HTTP/2 with requests' timeout, verify and stream arguments.
+
+        429/5xx replies are retried under the same policy as HTTP/1.1
+        (build_retry), sleeping for Retry-After or the jittered backoff;
+        httpx's transport retries failed connects. As with urllib3, the last
+        reply is returned once retries run out.
+        """
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        client = self.http2_client(verify)
+        retries = self.max_retries
+        while True:
+            reply = self.send_http2_once(client, request, timeout, stream)
+            retry_after = reply.headers.get('Retry-After')
+            if not retries.is_retry(request.method, reply.status_code, retry_after is not None):
+                break
+            try:
+                retries = retries.increment(request.method, request.url)
+            except MaxRetryError:
+                break
+            delay = retries.get_backoff_time()
+            if retry_after is not None and retries.respect_retry_after_header:
+                delay = retries.parse_retry_after(retry_after)
+            reply.close()
+            with self.stats_lock:
+                self.retried += 1
+            time.sleep(delay)
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.headers = CaseInsensitiveDict(reply.headers)
+        if stream:
+            # The body is unread, so only a charset from the headers is known
+            response.raw = HTTPXBody(reply)
+            response.encoding = reply.charset_encoding
+        else:
+            response._content = reply.content
+            response.encoding = reply.encoding
+        response.url = str(reply.url)
+        response.reason = reply.reason_phrase
+        response.request = request
+        return response
+
+    def send_http2_once(self, client, request, timeout, stream: bool):
+        try:
+            reply = client.send(client.build_request(request.method, request.url,
+                                                     headers=dict(request.headers),
+                                                     content=request.body, timeout=timeout),
+                                stream=stream)
+            if not stream:
+                reply.read()
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+        with self.stats_lock:
+            self.http2_requests += 1
+        return reply
+
+    def stats(self) -> Dict:
+        """New connections opened versus requests sent, over all hosts.
+
+        httpx does not expose connection counts, so over HTTP/2 only the
+        requests are counted and the reuse figures are None.
+        """
+        if self.http2:
+            return {'http2': True, 'requests': self.http2_requests,
+                    'connections_opened': None, 'reuse_rate': None, 'retries': self.retried}
+        opened = requests_sent = 0
+        pools = self.poolmanager.pools
+        for pool in (pools[key] for key in pools.keys()):
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+        return {
+            'http2': False,
+            'requests': requests_sent,
+            'connections_opened': opened,
+            'reuse_rate': round(1 - opened / requests_sent, 4) if requests_sent else 0.0,
+            'retries': self.retried,
+        }
+
+    def close(self):
+        super().close()
+        for client in self.http2_clients.values():
+            client.close()
+
+
+def build_session(adapter: Optional[HTTPAdapter] = None) -> requests.Session:
+    """A Session with default headers and a TunedAdapter mounted for http(s)."""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = adapter or TunedAdapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def transport_stats(session: requests.Session) -> Dict:
+    adapter = session.get_adapter('https://')
+    return adapter.stats() if isinstance(adapter, TunedAdapter) else {}
+
+
+def aiohttp_connector(limit: int, config: Dict = TRANSPORT_CONFIG):
+    """TCPConnector sized to the crawl's concurrency, keeping connections alive."""
+    import aiohttp
+
+    return aiohttp.TCPConnector(limit=limit, limit_per_host=config['pool_maxsize'],
+                                keepalive_timeout=config['keepalive_timeout'],
+                                ttl_dns_cache=300)
+
+
+def aiohttp_timeout(config: Dict = TRANSPORT_CONFIG):
+    import aiohttp
+
+    return aiohttp.ClientTimeout(sock_connect=config['connect_timeout'],
+                                 sock_read=config['read_timeout'])
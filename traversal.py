@@ -0,0 +1,135 @@
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+
+from config import INDEX_FETCH_WORKERS, TRAVERSAL_STRATEGY
+
+logger = logging.getLogger(__name__)
+
+PAGE_COUNT_RE = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+
+
+class TraversalError(Exception):
+    """The site's entry page failed, so no book URLs could be enumerated."""
+
+
+def page_count(soup: BeautifulSoup) -> Optional[int]:
+    """Read N from the pager's "Page 1 of N", if the page has one."""
+    current = soup.find('li', class_='current')
+    match = PAGE_COUNT_RE.search(current.text) if current else None
+    return int(match.group(1)) if match else None
+
+
+class CategoryTraversal:
+    """Home page sidebar, then every category's paginated listing in turn.
+
+    With `max_age` the category list is kept for that many seconds, so a
+    long-lived process does not re-read the sidebar on every crawl.
+    """
+    name = 'category'
+
+    def __init__(self, max_age: float = 0):
+        self.max_age = max_age
+        self.category_urls: Optional[List[str]] = None
+        self.fetched_at = 0.0
+
+    def categories(self, scraper) -> Optional[List[str]]:
+        """Category URLs from the home page sidebar, or None if it failed."""
+        if self.category_urls is None or time.monotonic() - self.fetched_at > self.max_age:
+            soup = scraper.get_page(scraper.base_url)
+            if soup is None:
+                return None
+            self.category_urls = scraper.parse_category_urls(soup)
+            self.fetched_at = time.monotonic()
+        return self.category_urls
+
+    def book_urls(self, scraper) -> Optional[Iterator[str]]:
+        """Product URLs in crawl order, or None if the site's entry page failed."""
+        category_urls = self.categories(scraper)
+        if category_urls is None:
+            return None
+        return self.walk(scraper, category_urls)
+
+    def walk(self, scraper, category_urls: List[str]) -> Iterator[str]:
+        for category_url in category_urls:
+            logger.info(f"Scraping category: {category_url}")
+            for _, book_urls in scraper.listing_pages(category_url):
+                yield from book_urls
+
+
+class CatalogueIndexTraversal:
+    """The unified catalogue/page-N.html index of every book.
+
+    The first page gives the page count, so the remaining index pages are
+    fetched in parallel (still through the politeness scheduler). Categories
+    come from each product page's breadcrumb, as in the category traversal.
+    """
+    name = 'catalogue'
+
+    def __init__(self, workers: int = INDEX_FETCH_WORKERS):
+        self.workers = workers
+
+    def page_url(self, scraper, page_num: int) -> str:
+        return f"{scraper.base_url}/catalogue/page-{page_num}.html"
+
+    def book_urls(self, scraper) -> Optional[Iterator[str]]:
+        """Product URLs in index order, or None if there is no catalogue index."""
+        first = scraper.get_page(self.page_url(scraper, 1))
+        if first is None or not scraper.parse_book_links(first):
+            return None
+        return self.walk(scraper, first)
+
+    def walk(self, scraper, first: BeautifulSoup) -> Iterator[str]:
+        yield from scraper.parse_book_links(first)
+        pages = page_count(first)
+        if pages is None:
+            # No "Page 1 of N": follow the next links one page at a time
+            url, soup = self.page_url(scraper, 1), first
+            while url := scraper.next_page_url(soup, url):
+                soup = scraper.get_page(url)
+                if soup is None:
+                    scraper.listing_failed(url)
+                    return
+                yield from scraper.parse_book_links(soup)
+            return
+        logger.info(f"Scraping catalogue index: {pages} pages")
+        urls = [self.page_url(scraper, page_num) for page_num in range(2, pages + 1)]
+        with ThreadPoolExecutor(self.workers) as pool:
+            for url, soup in zip(urls, pool.map(scraper.get_page, urls)):
+                if soup is None:
+                    scraper.listing_failed(url)
+                else:
+                    yield from scraper.parse_book_links(soup)
+
+
+class AutoTraversal:
+    """Use the catalogue index when the site has one, categories otherwise."""
+    name = 'auto'
+
+    def __init__(self, category_max_age: float = 0):
+        self.strategies = [CatalogueIndexTraversal(), CategoryTraversal(category_max_age)]
+
+    def book_urls(self, scraper) -> Optional[Iterator[str]]:
+        for strategy in self.strategies:
+            book_urls = strategy.book_urls(scraper)
+            if book_urls is not None:
+                logger.info(f"Traversing by {strategy.name}")
+                return book_urls
+        return None
+
+
+TRAVERSALS = {
+    'auto': AutoTraversal,
+    'category': CategoryTraversal,
+    'catalogue': CatalogueIndexTraversal,
+}
+
+
+def get_traversal(name: str = TRAVERSAL_STRATEGY):
+    if name not in TRAVERSALS:
+        raise ValueError(f"Unknown traversal strategy {name!r}; choose from {list(TRAVERSALS)}")
+    return TRAVERSALS[name]()
@@ -1,5 +1,8 @@
-from models import SessionLocal, Book
-import pandas as pd
+from sqlalchemy import select
+
+from models import SessionLocal, Book, get_engine
+from query_cache import cached_stats, query_cache
+from search import search_books
 from tabulate import tabulate
 
 
@@ -7,46 +10,46 @@ def view_database_stats():
     """Display basic statistics about the database."""
     db = SessionLocal()
     try:
-        total_books = db.query(Book).count()
-        categories = db.query(Book.category).distinct().all()
-        categories = [cat[0] for cat in categories]
+        stats = cached_stats(db)
 
         print("\n=== Database Statistics ===")
-        print(f"Total books: {total_books}")
-        print(f"Number of categories: {len(categories)}")
+        print(f"Total books: {stats['total_books']}")
+        print(f"Number of categories: {stats['categories']}")
         print("\nCategories:")
-        for cat in categories:
-            count = db.query(Book).filter(Book.category == cat).count()
-            print(f"- {cat}: {count} books")
+        for row in stats['per_category']:
+            print(f"- {row['category']}: {row['count']} books")
+        return stats
     finally:
         db.close()
 
 
+def book_rows(db, limit, category):
+    """Display rows for view_books and the number of matching books."""
+    query = db.query(Book)
+    if category:
+        query = query.filter(Book.category == category)
+    books_data = []
+    for book in query.limit(limit).all():
+        books_data.append({
+            'Title': book.title,
+            'Price': f"£{book.price:.2f}",
+            'Category': book.category,
+            'Rating': book.rating,
+            'In Stock': 'Yes' if book.in_stock else 'No',
+            'Availability': book.availability
+        })
+    return books_data, query.count()
+
+
 def view_books(limit=10, category=None):
     """Display books from the database."""
     db = SessionLocal()
     try:
-        query = db.query(Book)
-        if category:
-            query = query.filter(Book.category == category)
-
-        books = query.limit(limit).all()
-
-        # Convert to list of dicts for display
-        books_data = []
-        for book in books:
-            books_data.append({
-                'Title': book.title,
-                'Price': f"£{book.price:.2f}",
-                'Category': book.category,
-                'Rating': book.rating,
-                'In Stock': 'Yes' if book.in_stock else 'No',
-                'Availability': book.availability
-            })
-
+        books_data, total = query_cache.get(db, ('books', limit, category),
+                                            lambda db: book_rows(db, limit, category))
         if books_data:
             print(
-                f"\n=== Books in Database (showing {len(books_data)} of {query.count()}) ===")
+                f"\n=== Books in Database (showing {len(books_data)} of {total}) ===")
             print(tabulate(books_data, headers='keys', tablefmt='grid'))
         else:
             print("No books found in the database.")
@@ -54,39 +57,62 @@ def view_books(limit=10, category=None):
         db.close()
 
 
-def export_to_pandas():
-    """Export database to pandas DataFrame for analysis."""
+def view_search_results(term, limit=10, category=None):
+    """Display the best full-text matches for `term` in titles and descriptions."""
     db = SessionLocal()
     try:
-        books = db.query(Book).all()
-        data = []
-        for book in books:
-            data.append({
-                'title': book.title,
-                'price': book.price,
-                'category': book.category,
-                'rating': book.rating,
-                'availability': book.availability,
-                'in_stock': book.in_stock,
-                'num_reviews': book.num_reviews
-            })
-        return pd.DataFrame(data)
+        books = query_cache.get(db, ('search', term, category, limit), lambda db: [{
+            'Title': book.title,
+            'Price': f"£{book.price:.2f}",
+            'Category': book.category,
+            'Rating': book.rating,
+        } for book in search_books(db, term, category=category, limit=limit)])
+        if books:
+            print(f"\n=== Search results for '{term}' (top {len(books)}) ===")
+            print(tabulate(books, headers='keys', tablefmt='grid'))
+        else:
+            print(f"No books match '{term}'.")
     finally:
         db.close()
 
 
+PANDAS_COLUMNS = ['title', 'price', 'category', 'rating',
+                  'availability', 'in_stock', 'num_reviews']
+
+
+def export_to_pandas(snapshot=None):
+    """Export database to pandas DataFrame for analysis.
+
+    If `snapshot` is the path of a Parquet/Arrow export, it is loaded
+    directly instead of querying the database.
+    """
+    if snapshot:
+        from export_utils import load_snapshot
+        return load_snapshot(snapshot, columns=PANDAS_COLUMNS)
+    import pandas as pd
+
+    # Core rows straight into the frame, without ORM objects or per-row dicts
+    stmt = select(*(getattr(Book, column) for column in PANDAS_COLUMNS))
+    with get_engine().connect() as conn:
+        return pd.DataFrame.from_records(conn.execute(stmt).all(), columns=PANDAS_COLUMNS)
+
+
 if __name__ == "__main__":
     print("=== Books to Scrape Database Viewer ===")
 
     # Show database statistics
-    view_database_stats()
+    stats = view_database_stats()
 
     # Show sample of books
     print("\nSample of books in database:")
     view_books(limit=5)
 
-    # Export to pandas for analysis
-    df = export_to_pandas()
+    # Price statistics are aggregated in SQL, not in pandas
     print("\n=== Price Statistics by Category ===")
-    print(df.groupby('category')['price'].agg(
-        ['count', 'mean', 'min', 'max']).round(2))
+    print(tabulate([{
+        'category': row['category'],
+        'count': row['count'],
+        'mean': round(row['avg_price'], 2),
+        'min': row['min_price'],
+        'max': row['max_price'],
+    } for row in stats['per_category']], headers='keys'))